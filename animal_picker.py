@@ -0,0 +1,133 @@
+import logging
+from PySide6.QtWidgets import QLineEdit, QCompleter
+from PySide6.QtCore import Qt, QTimer, QModelIndex, QCoreApplication
+from PySide6.QtGui import QStandardItemModel, QStandardItem
+from queries import search_animals, find_animals, animal_name, PICKER_PAGE_SIZE
+from db_worker import DbExecutor
+import profiler
+
+logger = logging.getLogger(__name__)
+_executor = None
+
+
+# Общий исполнитель запросов полей выбора; у каждого поля свой ключ задачи,
+# поэтому новый набор отменяет устаревшую страницу только этого поля.
+# Пул принадлежит приложению и при выходе дожидается начатых запросов
+def picker_executor():
+    global _executor
+    if _executor is None:
+        _executor = DbExecutor(QCoreApplication.instance())
+    return _executor
+
+
+# Выбор животного по первым буквам имени. Вместо списка всех животных в подсказке
+# держится только страница совпадений, следующая страница подгружается при
+# прокрутке подсказки до конца. Пустое поле означает "не выбрано" и допустимо
+# только для необязательного поля (required=False). Страницы читаются в DbExecutor
+class AnimalPicker(QLineEdit):
+    def __init__(self, sex=None, placeholder="Начните вводить имя", required=True, parent=None):
+        super().__init__(parent)
+        self.sex = sex
+        self.required = required
+        self.animal_id = None
+        self.prefix = ""
+        self.last_key = None
+        self.exhausted = True
+        self.loading = False
+        self.search_key = ("animal_picker", id(self))
+        self.destroyed.connect(lambda _=None, key=self.search_key: picker_executor().cancel(key))
+        self.setPlaceholderText(placeholder)
+
+        self.items = QStandardItemModel(self)
+        self.picker_completer = QCompleter(self.items, self)
+        self.picker_completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.picker_completer.activated[QModelIndex].connect(self.choose)
+        self.picker_completer.popup().verticalScrollBar().valueChanged.connect(self.scrolled)
+        self.setCompleter(self.picker_completer)
+
+        # Запрос к базе - после паузы в наборе, а не на каждую букву
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(200)
+        self.search_timer.timeout.connect(self.search)
+        self.textEdited.connect(self.text_edited)
+
+    def text_edited(self, text):
+        self.animal_id = None
+        self.search_timer.start()
+
+    def search(self):
+        picker_executor().cancel(self.search_key)
+        self.prefix = self.text().strip()
+        self.items.clear()
+        self.last_key = None
+        self.loading = False
+        self.exhausted = not self.prefix
+        if self.prefix:
+            self.fetch_more()
+
+    def fetch_more(self):
+        if self.loading:
+            return
+        self.loading = True
+        with profiler.action(f"Выбор животного: {self.prefix}"):
+            picker_executor().submit(self.search_key, search_animals, self.prefix, self.sex, self.last_key,
+                                     on_result=self.page_loaded, on_error=self.page_failed)
+
+    def page_loaded(self, rows):
+        self.loading = False
+        first_page = self.last_key is None
+        for animal_id, name, key in rows:
+            item = QStandardItem(name)
+            item.setData(animal_id, Qt.UserRole)
+            self.items.appendRow(item)
+            self.last_key = (key, animal_id)
+        self.exhausted = len(rows) < PICKER_PAGE_SIZE
+        if first_page:
+            self.picker_completer.complete()
+
+    def page_failed(self, error):
+        # Подсказка не обязательна: имя всё равно проверяется при сохранении
+        logger.warning("Не удалось загрузить подсказку для «%s»: %s", self.prefix, error)
+        self.loading = False
+        self.exhausted = True
+
+    def scrolled(self, value):
+        if not self.exhausted and not self.loading and value == self.picker_completer.popup().verticalScrollBar().maximum():
+            self.fetch_more()
+
+    def choose(self, index):
+        self.animal_id = index.data(Qt.UserRole)
+
+    def set_animal(self, animal_id):
+        self.animal_id = animal_id
+        name = animal_name(animal_id) if animal_id is not None else None
+        self.setText(name or "")
+
+    def currentData(self):
+        # Имя введено полностью, но не выбрано из подсказки: берём точное совпадение
+        # среди загруженных, только если оно там одно и следующая страница не может
+        # добавить второе (строки упорядочены по имени). Иначе проверяем в базе.
+        # Неоднозначное имя не выбирается
+        text = self.text().strip()
+        if self.animal_id is None and text:
+            rows = [row for row in range(self.items.rowCount())
+                    if self.items.item(row).text().lower() == text.lower()]
+            if len(rows) == 1 and (self.exhausted or rows[0] < self.items.rowCount() - 1):
+                self.animal_id = self.items.item(rows[0]).data(Qt.UserRole)
+            else:
+                ids = find_animals(text, self.sex)
+                if len(ids) == 1:
+                    self.animal_id = ids[0]
+        return self.animal_id
+
+    def error(self):
+        # Сообщение, если значение нельзя сохранить, иначе None
+        text = self.text().strip()
+        if not text:
+            return "Выберите животное" if self.required else None
+        if self.currentData() is None:
+            if find_animals(text, self.sex):
+                return f"Несколько животных с именем «{text}», выберите нужное из списка"
+            return f"Животное «{text}» не найдено"
+        return None
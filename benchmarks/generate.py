@@ -0,0 +1,123 @@
+import random
+from datetime import date, timedelta
+from itertools import islice
+from sqlalchemy import insert, select
+from db import (Base, migrate, Position, Species, Enclosure, Animal, HealthRecord, Employee,
+                AnimalCaretaker, Feed, AnimalFeed, Offspring)
+
+SYLLABLES = ["ба", "ри", "ко", "ла", "ми", "то", "са", "ну", "ге", "да", "ра", "зо", "ве", "лю", "пи"]
+NOTES = ["Плановый осмотр", "Вакцинация", "Травма лапы", "Снижение аппетита", "Здоров",
+         "Обработка от паразитов", "Контроль веса", "Стоматологический осмотр"]
+BATCH_SIZE = 10000
+# Масштабы синтетической базы: число животных
+SCALES = {"1k": 1000, "100k": 100000, "1m": 1000000}
+
+
+def random_name(rng, parts=3):
+    return "".join(rng.choice(SYLLABLES) for _ in range(parts)).capitalize()
+
+
+def random_date(rng, start_year=2000, end_year=2024):
+    start = date(start_year, 1, 1)
+    return start + timedelta(days=rng.randrange((date(end_year, 12, 31) - start).days))
+
+
+def insert_rows(connection, model, rows):
+    # rows может быть генератором: в памяти одновременно только одна пачка
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, BATCH_SIZE))
+        if not batch:
+            break
+        connection.execute(insert(model), batch)
+
+
+def insert_with_ids(connection, model, rows, after_id=0):
+    # Вставка с возвратом id новых строк (все id больше after_id)
+    insert_rows(connection, model, rows)
+    return connection.execute(select(model.id).where(model.id > after_id).order_by(model.id)).scalars().all()
+
+
+def reset(bind):
+    # Пересоздание схемы. Только для отдельной базы замеров!
+    Base.metadata.drop_all(bind)
+    migrate(bind)
+
+
+# Синтетические данные зоопарка: размеры остальных таблиц пропорциональны числу животных
+def populate(bind, animals, seed=0):
+    rng = random.Random(seed)
+    with bind.begin() as connection:
+        position_ids = insert_with_ids(connection, Position, [
+            {"name": name} for name in ["Смотритель", "Ветеринар", "Кормач", "Зоотехник"]
+        ])
+        species_ids = insert_with_ids(connection, Species, [
+            {"name": random_name(rng, 4)} for _ in range(max(10, animals // 100))
+        ])
+        enclosure_ids = insert_with_ids(connection, Enclosure, [
+            {"name": random_name(rng, 3), "size": rng.uniform(10, 5000),
+             "location": f"Сектор {rng.randrange(1, 30)}", "description": rng.choice(NOTES)}
+            for _ in range(max(5, animals // 200))
+        ])
+        feed_ids = insert_with_ids(connection, Feed, [
+            {"name": random_name(rng, 2), "description": rng.choice(NOTES)}
+            for _ in range(max(5, animals // 500))
+        ])
+        employee_ids = insert_with_ids(connection, Employee, [
+            {"name": f"{random_name(rng, 3)} {random_name(rng, 2)}", "position_id": rng.choice(position_ids),
+             "phone": f"+7{rng.randrange(10 ** 9, 10 ** 10)}", "hire_date": random_date(rng, 2005)}
+            for _ in range(max(5, animals // 50))
+        ])
+        # Животные и связанные с ними записи создаются пачками, чтобы масштаб
+        # в миллион животных не требовал держать все строки в памяти
+        females = []
+        males = []
+        last_animal_id = 0
+        for start in range(0, animals, BATCH_SIZE):
+            animal_rows = [
+                {"name": random_name(rng), "species_id": rng.choice(species_ids),
+                 "enclosure_id": rng.choice(enclosure_ids), "date_of_birth": random_date(rng),
+                 "date_of_arrival": random_date(rng, 2010), "sex": rng.choice(["Male", "Female"])}
+                for _ in range(min(BATCH_SIZE, animals - start))
+            ]
+            animal_ids = insert_with_ids(connection, Animal, animal_rows, last_animal_id)
+            last_animal_id = animal_ids[-1]
+            for animal_id, row in zip(animal_ids, animal_rows):
+                (females if row["sex"] == "Female" else males).append(animal_id)
+
+            insert_rows(connection, HealthRecord, (
+                {"animal_id": rng.choice(animal_ids), "checkup_date": random_date(rng, 2015),
+                 "notes": rng.choice(NOTES)}
+                for _ in range(len(animal_ids) * 2)
+            ))
+            insert_rows(connection, AnimalFeed, (
+                {"animal_id": animal_id, "feed_id": rng.choice(feed_ids), "daily_amount": round(rng.uniform(0.1, 40), 2)}
+                for animal_id in animal_ids
+            ))
+            insert_rows(connection, AnimalCaretaker, (
+                {"animal_id": animal_id, "employee_id": rng.choice(employee_ids)}
+                for animal_id in animal_ids
+            ))
+            # Родословная: часть животных записана потомством более ранних животных
+            insert_rows(connection, Offspring, (
+                {"name": row["name"],
+                 "mother_id": females[rng.randrange(max(1, len(females) * index // animals))],
+                 "father_id": males[rng.randrange(max(1, len(males) * index // animals))],
+                 "date_of_birth": row["date_of_birth"], "sex": row["sex"]}
+                for index, row in enumerate(animal_rows, start)
+                if index > animals // 10 and females and males and rng.random() < 0.5
+            ))
+
+
+# Заполнение отдельной базы синтетическими данными (схема пересоздаётся):
+#   python -m benchmarks.generate sqlite:////tmp/zoo_bench.db 100k
+if __name__ == "__main__":
+    import sys
+    from db import DATABASE_URL, make_engine
+    if len(sys.argv) != 3 or sys.argv[2] not in SCALES:
+        sys.exit(f"usage: python -m benchmarks.generate DATABASE_URL {{{','.join(SCALES)}}}")
+    if sys.argv[1] == DATABASE_URL:
+        sys.exit("Генерация удаляет данные - укажите отдельную базу")
+    bind = make_engine(url=sys.argv[1])
+    reset(bind)
+    populate(bind, SCALES[sys.argv[2]])
@@ -0,0 +1,166 @@
+import csv
+import json
+import os
+from datetime import datetime
+from time import perf_counter
+from sqlalchemy import select, insert, func, Date, Float, String
+from db import unit_of_work, Animal, Species, Enclosure, HealthRecord, AnimalFeed, Feed
+
+IMPORT_BATCH_SIZE = 1000
+DATE_FORMATS = ("%Y-%m-%d", "%d.%m.%Y")
+
+
+# Файл не прошёл проверку: errors - сообщения по строкам, в базу ничего не записано
+class BulkImportError(Exception):
+    def __init__(self, errors):
+        super().__init__(f"Ошибок в файле: {len(errors)}")
+        self.errors = errors
+
+
+class ImportResult:
+    def __init__(self, count, seconds):
+        self.count = count
+        self.seconds = seconds
+
+    def rate(self):
+        return self.count / self.seconds if self.seconds else 0.0
+
+
+# Поле импортируемой записи: столбец модели и допустимые заголовки в файле.
+# Для внешнего ключа reference - модель, в которой значение ищется по названию
+class ImportField:
+    def __init__(self, column, headers, reference=None, required=False, choices=None):
+        self.column = column
+        self.headers = [header.lower() for header in headers]
+        self.reference = reference
+        self.required = required
+        self.choices = choices
+
+    def raw_value(self, record):
+        for key, value in record.items():
+            if key is not None and key.strip().lower() in self.headers:
+                return value.strip() if isinstance(value, str) else value
+        return None
+
+    def convert(self, value, references):
+        # Значение из файла -> значение столбца; ValueError с понятным сообщением при ошибке
+        if value is None or value == "":
+            if self.required:
+                raise ValueError(f"не заполнено поле «{self.headers[0]}»")
+            return None
+        if self.reference is not None:
+            ids = references[self.column.key].get(str(value).lower())
+            if not ids:
+                raise ValueError(f"не найдено: «{value}»")
+            if len(ids) > 1:
+                raise ValueError(f"несколько записей с названием «{value}»")
+            return ids[0]
+        column_type = self.column.type
+        if isinstance(column_type, Date):
+            for date_format in DATE_FORMATS:
+                try:
+                    return datetime.strptime(str(value), date_format).date()
+                except ValueError:
+                    pass
+            raise ValueError(f"неверная дата «{value}»")
+        if isinstance(column_type, Float):
+            try:
+                number = float(str(value).replace(",", "."))
+            except ValueError:
+                raise ValueError(f"неверное число «{value}»")
+            if number < 0:
+                raise ValueError(f"отрицательное значение «{value}»")
+            return number
+        value = str(value)
+        if self.choices is not None and value not in self.choices:
+            raise ValueError(f"недопустимое значение «{value}», ожидается: {', '.join(self.choices)}")
+        if isinstance(column_type, String) and column_type.length and len(value) > column_type.length:
+            raise ValueError(f"длиннее {column_type.length} символов: «{value}»")
+        return value
+
+
+# Импорт записей одной таблицы из CSV или JSON. Файл проверяется целиком, названия
+# справочников переводятся в id одним запросом на справочник, затем все строки
+# вставляются пачками executemany в одной транзакции
+class Importer:
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields
+
+    def read_records(self, path):
+        if os.path.splitext(path)[1].lower() == ".json":
+            with open(path, encoding="utf-8") as file:
+                records = json.load(file)
+            if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+                raise BulkImportError(["JSON должен содержать список объектов"])
+            return records
+        with open(path, newline="", encoding="utf-8-sig") as file:
+            sample = file.readline()
+            file.seek(0)
+            delimiter = ";" if sample.count(";") > sample.count(",") else ","
+            return list(csv.DictReader(file, delimiter=delimiter))
+
+    def resolve(self, session, records):
+        references = {}
+        for field in self.fields:
+            if field.reference is None:
+                continue
+            # Названия сравниваются без учёта регистра: "барсик" в файле находит "Барсик"
+            names = {str(value).lower() for value in (field.raw_value(record) for record in records) if value}
+            ids = {}
+            if names:
+                model = field.reference
+                query = select(model.id, model.name).where(func.lower(model.name).in_(names))
+                for item_id, name in session.execute(query):
+                    ids.setdefault(name.lower(), []).append(item_id)
+            references[field.column.key] = ids
+        return references
+
+    def run(self, path):
+        started = perf_counter()
+        records = self.read_records(path)
+        with unit_of_work() as session:
+            references = self.resolve(session, records)
+            rows = []
+            errors = []
+            for number, record in enumerate(records, 1):
+                row = {}
+                for field in self.fields:
+                    try:
+                        row[field.column.key] = field.convert(field.raw_value(record), references)
+                    except ValueError as e:
+                        errors.append(f"Запись {number}: {e}")
+                rows.append(row)
+            if errors:
+                raise BulkImportError(errors)
+            for start in range(0, len(rows), IMPORT_BATCH_SIZE):
+                session.execute(insert(self.model), rows[start:start + IMPORT_BATCH_SIZE])
+        return ImportResult(len(rows), perf_counter() - started)
+
+
+# Заголовки в файле: имена столбцов модели или заголовки таблиц главного окна,
+# поэтому файл, выгруженный кнопкой "Экспорт", загружается обратно без правок
+IMPORTERS = {
+    "Животные": Importer(Animal, [
+        ImportField(Animal.name, ["name", "Имя"], required=True),
+        ImportField(Animal.species_id, ["species", "Вид"], reference=Species),
+        ImportField(Animal.enclosure_id, ["enclosure", "Вольер"], reference=Enclosure),
+        ImportField(Animal.date_of_birth, ["date_of_birth", "Дата рождения"]),
+        ImportField(Animal.date_of_arrival, ["date_of_arrival", "Дата прибытия"]),
+        ImportField(Animal.sex, ["sex", "Пол"], choices=("Male", "Female")),
+    ]),
+    "Медицина": Importer(HealthRecord, [
+        ImportField(HealthRecord.animal_id, ["animal", "Животное"], reference=Animal, required=True),
+        ImportField(HealthRecord.checkup_date, ["checkup_date", "Дата осмотра"], required=True),
+        ImportField(HealthRecord.notes, ["notes", "Заметки"]),
+    ]),
+    "Кормление": Importer(AnimalFeed, [
+        ImportField(AnimalFeed.animal_id, ["animal", "Животное"], reference=Animal, required=True),
+        ImportField(AnimalFeed.feed_id, ["feed", "Корм"], reference=Feed, required=True),
+        ImportField(AnimalFeed.daily_amount, ["daily_amount", "Суточная норма (кг)"], required=True),
+    ]),
+}
+
+
+def import_file(section_name, path):
+    return IMPORTERS[section_name].run(path)
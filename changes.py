@@ -0,0 +1,60 @@
+import json
+import logging
+from db import engine, missing_change_triggers, CHANGES_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+
+# Слушатель уведомлений PostgreSQL об изменении строк. Отдельное соединение
+# держит LISTEN, а poll() только читает уже пришедшие уведомления из сокета,
+# не отправляя запросов в базу. Триггеры, отправляющие уведомления, создаёт
+# migrate(); если их нет, слушатель не включается и таблицы обновляются по Section.watermark
+class ChangeListener:
+    def __init__(self, bind=engine):
+        self.connection = None
+        if bind.dialect.name != "postgresql":
+            return
+        try:
+            with bind.connect() as connection:
+                missing = missing_change_triggers(connection)
+            if missing:
+                logger.warning("Уведомления об изменениях отключены: нет триггеров %s, выполните python db.py",
+                               ", ".join(missing))
+                return
+            pooled = bind.raw_connection()
+            pooled.detach()
+            self.connection = pooled.driver_connection
+            self.connection.autocommit = True
+            with self.connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANGES_CHANNEL}")
+        except Exception:
+            logger.exception("Уведомления об изменениях отключены: не удалось выполнить LISTEN")
+            self.close()
+
+    @property
+    def available(self):
+        return self.connection is not None
+
+    def poll(self):
+        # Возвращает список (таблица, операция, id) или None, если уведомления недоступны
+        if not self.available:
+            return None
+        try:
+            self.connection.poll()
+        except Exception:
+            logger.exception("Уведомления об изменениях отключены: соединение LISTEN потеряно")
+            self.close()
+            return None
+        changes = []
+        while self.connection.notifies:
+            payload = json.loads(self.connection.notifies.pop(0).payload)
+            changes.append((payload["table"], payload["op"], payload["id"]))
+        return changes
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+            self.connection = None
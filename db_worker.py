@@ -0,0 +1,115 @@
+import threading
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+from sqlalchemy import event
+from db import engine
+import profiler
+
+_local = threading.local()
+
+
+# Пока задача выполняет запрос, запоминаем его соединение, чтобы отмена
+# могла прервать запрос на сервере, а не только отбросить результат
+@event.listens_for(engine, "before_cursor_execute")
+def remember_connection(conn, cursor, statement, parameters, context, executemany):
+    task = getattr(_local, "task", None)
+    if task is not None:
+        task.connection = conn.connection.driver_connection
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def forget_connection(conn, cursor, statement, parameters, context, executemany):
+    task = getattr(_local, "task", None)
+    if task is not None:
+        task.connection = None
+
+
+class TaskSignals(QObject):
+    finished = Signal(object)
+    failed = Signal(object)
+    done = Signal()
+
+
+# Задача с запросом к базе. Функция выполняется в потоке пула и сама открывает
+# себе сессию через get_session(), результат возвращается в GUI-поток сигналом.
+# Запросы задачи учитываются в действии пользователя, во время которого она создана
+class DbTask(QRunnable):
+    def __init__(self, function, args):
+        super().__init__()
+        self.function = function
+        self.args = args
+        self.signals = TaskSignals()
+        self.cancelled = False
+        self.connection = None
+        self.action = profiler.current_action()
+        profiler.task_created(self.action)
+
+    def cancel(self):
+        self.cancelled = True
+        connection = self.connection
+        if connection is not None and hasattr(connection, "cancel"):
+            try:
+                connection.cancel()
+            except Exception:
+                pass
+
+    def run(self):
+        _local.task = self
+        try:
+            if self.cancelled:
+                return
+            try:
+                with profiler.activate(self.action):
+                    result = self.function(*self.args)
+            except Exception as e:
+                if not self.cancelled:
+                    self.signals.failed.emit(e)
+            else:
+                if not self.cancelled:
+                    self.signals.finished.emit(result)
+        finally:
+            _local.task = None
+            self.connection = None
+            profiler.task_finished(self.action)
+            self.signals.done.emit()
+
+
+# Исполнитель запросов вне GUI-потока. Для каждого ключа актуальна только
+# последняя задача: новая отправка отменяет предыдущую, а устаревшие результаты
+# отбрасываются, даже если уже были отправлены сигналом
+class DbExecutor(QObject):
+    def __init__(self, parent=None, max_threads=4):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self.current = {}
+        self.running = set()
+
+    def submit(self, key, function, *args, on_result=None, on_error=None):
+        self.cancel(key)
+        task = DbTask(function, args)
+        task.setAutoDelete(False)
+        self.current[key] = task
+        self.running.add(task)
+        task.signals.finished.connect(lambda result: self.deliver(key, task, on_result, result))
+        task.signals.failed.connect(lambda error: self.deliver(key, task, on_error, error))
+        task.signals.done.connect(lambda: self.running.discard(task))
+        self.pool.start(task)
+        return task
+
+    def cancel(self, key):
+        task = self.current.pop(key, None)
+        if task is not None:
+            task.cancel()
+            if self.pool.tryTake(task):
+                self.running.discard(task)
+                profiler.task_finished(task.action)
+
+    def deliver(self, key, task, callback, value):
+        if self.current.get(key) is not task:
+            return
+        del self.current[key]
+        if callback is not None:
+            callback(value)
+
+    def wait(self, msecs=-1):
+        return self.pool.waitForDone(msecs)
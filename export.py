@@ -0,0 +1,89 @@
+import csv
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+EXPORT_BATCH_SIZE = 1000
+
+# Символы, недопустимые в XML (управляющие, кроме табуляции и переводов строк)
+INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+XLSX_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>
+</Types>"""
+
+XLSX_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""
+
+XLSX_WORKBOOK = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>
+</workbook>"""
+
+XLSX_WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>
+</Relationships>"""
+
+
+def export_csv(section, path, text=None):
+    # Точка с запятой и BOM - чтобы файл сразу открывался в русской локали Excel
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8-sig") as file:
+        writer = csv.writer(file, delimiter=";")
+        writer.writerow(section.headers)
+        for values in section.stream_rows(text, EXPORT_BATCH_SIZE):
+            writer.writerow(["" if value is None else value for value in values])
+            count += 1
+    return count
+
+
+def xlsx_cell(value):
+    if value is None:
+        return "<c/>"
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"<c><v>{value}</v></c>"
+    text = escape(INVALID_XML_CHARS.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def xlsx_row(values):
+    return "<row>" + "".join(xlsx_cell(value) for value in values) + "</row>\n"
+
+
+def export_xlsx(section, path, text=None):
+    # Лист пишется в архив построчно (строки хранятся прямо в ячейках, без таблицы
+    # общих строк), поэтому память не растёт с размером раздела
+    count = 0
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", XLSX_CONTENT_TYPES)
+        archive.writestr("_rels/.rels", XLSX_RELS)
+        archive.writestr("xl/workbook.xml", XLSX_WORKBOOK.format(name=escape(section.name[:31])))
+        archive.writestr("xl/_rels/workbook.xml.rels", XLSX_WORKBOOK_RELS)
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                        b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>\n')
+            sheet.write(xlsx_row(section.headers).encode("utf-8"))
+            for values in section.stream_rows(text, EXPORT_BATCH_SIZE):
+                sheet.write(xlsx_row(values).encode("utf-8"))
+                count += 1
+            sheet.write(b"</sheetData></worksheet>")
+    return count
+
+
+# Фильтр диалога сохранения -> функция экспорта
+EXPORT_FORMATS = {
+    "CSV (*.csv)": export_csv,
+    "Excel (*.xlsx)": export_xlsx,
+}
+
+
+def export_filename(section_name, file_filter):
+    extension = ".xlsx" if "xlsx" in file_filter else ".csv"
+    return section_name.lower().replace(" ", "_") + extension
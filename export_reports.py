@@ -0,0 +1,57 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from reports import REPORT_TYPES, report_filename, write_report
+
+PEDIGREE_REPORT = "Отчёт по родословной"
+
+
+def render_report(report_type, directory, animal_name=None):
+    # Выполняется в отдельном процессе: у процесса свой движок и своя сессия
+    return write_report(report_type, os.path.join(directory, report_filename(report_type)), animal_name)
+
+
+# Построение всех отчётов сразу, каждый в своём процессе. Родословная строится,
+# только если задано имя животного. Возвращает список (тип отчёта, путь или исключение)
+def export_all_reports(directory, animal_name=None, max_workers=None):
+    report_types = [report_type for report_type in REPORT_TYPES
+                    if report_type != PEDIGREE_REPORT or animal_name]
+    os.makedirs(directory, exist_ok=True)
+    # spawn, а не fork: дочерний процесс не должен наследовать потоки Qt
+    # и открытые соединения пула родителя
+    with ProcessPoolExecutor(max_workers=max_workers or len(report_types),
+                             mp_context=get_context("spawn")) as executor:
+        futures = [(report_type, executor.submit(render_report, report_type, directory, animal_name))
+                   for report_type in report_types]
+        results = []
+        for report_type, future in futures:
+            try:
+                results.append((report_type, future.result()))
+            except Exception as e:
+                results.append((report_type, e))
+        return results
+
+
+# Запуск без интерфейса, например из cron:
+#   python export_reports.py /srv/reports/2024-05 --animal Барсик
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Построение всех отчётов зоопарка в PDF")
+    parser.add_argument("directory", help="каталог для отчётов")
+    parser.add_argument("--animal", help="имя животного для отчёта по родословной")
+    parser.add_argument("--workers", type=int, help="число процессов")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for report_type, result in export_all_reports(args.directory, args.animal, args.workers):
+        if isinstance(result, Exception):
+            failed = True
+            print(f"{report_type}: ошибка: {result}", file=sys.stderr)
+        else:
+            print(f"{report_type}: {result}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+import os
+import pickle
+import threading
+from fpdf import FPDF
+
+FONT_FAMILY = "FreeSans"
+FONT_DIR = os.path.dirname(os.path.abspath(__file__))
+FONT_PATH = os.path.join(FONT_DIR, "FreeSans.ttf")
+# Кэши метрик, которые FPDF создаёт рядом со шрифтом: ширины символов и диапазоны ширин до 127
+METRICS_PATH = os.path.join(FONT_DIR, "FreeSans.pkl")
+WIDTHS_PATH = os.path.join(FONT_DIR, "FreeSans.cw127.pkl")
+
+_metrics = None
+_lock = threading.Lock()
+
+
+def read_cached_metrics():
+    # Кэш подходит, только если создан для этого же файла шрифта и читается целиком
+    try:
+        with open(METRICS_PATH, "rb") as fh:
+            metrics = pickle.load(fh)
+        if os.path.exists(WIDTHS_PATH):
+            with open(WIDTHS_PATH, "rb") as fh:
+                widths = pickle.load(fh)
+            if not {"rangeid", "range", "prevcid", "prevwidth", "interval", "range_interval"} <= set(widths):
+                return None
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, TypeError):
+        return None
+    if (not isinstance(metrics, dict) or metrics.get("type") != "TTF" or not metrics.get("cw")
+            or metrics.get("originalsize") != os.path.getsize(FONT_PATH)):
+        return None
+    return metrics
+
+
+def parse_metrics():
+    # Кэш отсутствует или устарел: удаляем его и даём FPDF разобрать TTF заново,
+    # add_font при этом сам запишет свежие .pkl
+    for path in (METRICS_PATH, WIDTHS_PATH):
+        if os.path.exists(path):
+            os.remove(path)
+    pdf = FPDF()
+    pdf.add_font(FONT_FAMILY, "", FONT_PATH, uni=True)
+    font = pdf.fonts[FONT_FAMILY.lower()]
+    return dict(font, originalsize=os.path.getsize(FONT_PATH))
+
+
+def load_metrics():
+    global _metrics
+    with _lock:
+        if _metrics is None:
+            _metrics = read_cached_metrics() or parse_metrics()
+    return _metrics
+
+
+# Подключение FreeSans к документу без повторного чтения шрифта: метрики загружаются
+# один раз на процесс, а в PDF при выводе встраиваются только использованные глифы
+def register_font(pdf):
+    fontkey = FONT_FAMILY.lower()
+    if fontkey in pdf.fonts:
+        return
+    metrics = load_metrics()
+    pdf.fonts[fontkey] = {
+        "i": len(pdf.fonts) + 1, "type": metrics["type"],
+        "name": metrics["name"], "desc": metrics["desc"],
+        "up": metrics["up"], "ut": metrics["ut"],
+        "cw": metrics["cw"],
+        "ttffile": FONT_PATH, "fontkey": fontkey,
+        "subset": list(range(0, 57 if hasattr(pdf, "str_alias_nb_pages") else 32)),
+        "unifilename": METRICS_PATH,
+    }
+    pdf.font_files[fontkey] = {"length1": metrics["originalsize"], "type": "TTF", "ttffile": FONT_PATH}
+    pdf.font_files[FONT_PATH] = {"type": "TTF"}
@@ -0,0 +1,92 @@
+import threading
+import time
+from itertools import chain
+from sqlalchemy import select, event
+from db import get_session, Session, Species, Enclosure, Position, Feed, Employee
+
+# Без уведомлений об изменениях чужие правки справочников видны не позже чем через
+# столько секунд; свои изменения сбрасывают справочник сразу (события сессии)
+FALLBACK_MAX_AGE = 60
+
+
+# Справочник для выпадающих списков диалогов: строки (id, название, ...) читаются
+# из базы при первом обращении и хранятся, пока таблица не изменится
+class Lookup:
+    def __init__(self, model, *extra_columns):
+        self.model = model
+        self.columns = (model.id, model.name) + extra_columns
+        self.rows = None
+        self.loaded_at = None
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def items(self):
+        rows = self.rows
+        if rows is not None:
+            return rows
+        with self.lock:
+            if self.rows is None:
+                generation = self.generation
+                with get_session() as session:
+                    rows = session.execute(select(*self.columns).order_by(self.model.id)).all()
+                # Если таблица изменилась, пока шло чтение, результат не запоминается
+                if generation == self.generation:
+                    self.rows = rows
+                    self.loaded_at = time.monotonic()
+                return rows
+            return self.rows
+
+    def invalidate(self):
+        self.generation += 1
+        self.rows = None
+
+    def is_stale(self, max_age):
+        return self.rows is not None and time.monotonic() - self.loaded_at > max_age
+
+
+LOOKUPS = {lookup.model.__tablename__: lookup for lookup in [
+    Lookup(Species),
+    Lookup(Enclosure),
+    Lookup(Position),
+    Lookup(Feed),
+    Lookup(Employee),
+]}
+
+
+def lookup(model):
+    return LOOKUPS[model.__tablename__].items()
+
+
+def invalidate_tables(tables):
+    for table in tables:
+        if table in LOOKUPS:
+            LOOKUPS[table].invalidate()
+
+
+def invalidate_changes(changes):
+    # changes - уведомления ChangeListener о чужих изменениях; None означает,
+    # что уведомления недоступны: тогда сбрасываются только давно прочитанные справочники,
+    # а не все на каждой проверке
+    if changes is None:
+        invalidate_tables([table for table, item in LOOKUPS.items() if item.is_stale(FALLBACK_MAX_AGE)])
+    else:
+        invalidate_tables({table for table, _, _ in changes})
+
+
+# Свои изменения: таблицы запоминаются при flush, а справочники сбрасываются
+# только после успешного commit
+@event.listens_for(Session, "after_flush")
+def remember_changed_tables(session, flush_context):
+    changed = session.info.setdefault("changed_lookups", set())
+    for item in chain(session.new, session.dirty, session.deleted):
+        changed.add(item.__table__.name)
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_committed(session):
+    invalidate_tables(session.info.pop("changed_lookups", ()))
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_rolled_back(session):
+    session.info.pop("changed_lookups", None)
@@ -1,11 +1,36 @@
-from PySide6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QTableWidget, QWidget,
-                               QTableWidgetItem, QHBoxLayout, QLabel, QLineEdit, QPushButton,
+from PySide6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QTableView, QWidget,
+                               QHBoxLayout, QLabel, QLineEdit, QPushButton,
                                QDialog, QFormLayout, QDateEdit, QComboBox, QMessageBox, QDoubleSpinBox,
-                               QSizePolicy, QHeaderView, QInputDialog, QFileDialog)
+                               QSizePolicy, QHeaderView, QInputDialog, QFileDialog, QProgressBar)
 from PySide6.QtCore import QDate, Qt, QSize, Signal, QTimer
-from PySide6.QtGui import QIcon
-from db import get_session, Animal, Species, Enclosure, Employee, HealthRecord, AnimalFeed, Feed, Offspring, AnimalCaretaker, Position
-from fpdf import FPDF
+from PySide6.QtGui import QIcon, QShortcut, QKeySequence, QGuiApplication
+from db import get_session, Species, Enclosure, Employee, Feed, Position
+from queries import SECTIONS
+from table_model import SectionTableModel
+from changes import ChangeListener
+from lookups import lookup, invalidate_changes
+from services import REPOSITORIES
+from animal_picker import AnimalPicker
+from db_worker import DbExecutor
+from reports import REPORT_TYPES, report_filename, ReportError
+from report_jobs import ReportQueue
+from export_reports import export_all_reports
+from export import EXPORT_FORMATS, export_filename
+from bulk_import import IMPORTERS, BulkImportError, import_file
+from profiler_panel import ProfilerPanel
+import profiler
+import startup
+from theme import apply_theme, set_style_state
+
+_pixmaps = {}
+
+
+# SVG растрируется один раз на размер: восемь кнопок разделов используют одну картинку "+"
+def svg_pixmap(path, size):
+    key = (path, size.width(), size.height())
+    if key not in _pixmaps:
+        _pixmaps[key] = QIcon(path).pixmap(size, QGuiApplication.primaryScreen().devicePixelRatio())
+    return _pixmaps[key]
 
 # Кастомный класс для кнопки с иконкой "+"
 class CustomButtonWidget(QWidget):
@@ -20,41 +45,14 @@ class CustomButtonWidget(QWidget):
         self.layout.setSpacing(0)
 
         self.main_button = QPushButton(text)
-        self.main_button.setStyleSheet("""
-            QPushButton {
-                background-color: #FFFFFF;
-                color: #636363;
-                border-radius: 5px;
-                border: 1px solid #ECECEC;
-                padding: 5px 10px;
-                font-size: 14px;
-                text-align: left;
-                padding-right: 50px;
-                position: relative;
-            }
-            QPushButton:hover {
-                background-color: #C7E8FF;
-                color: #636363;
-            }
-        """)
+        self.main_button.setObjectName("section_button")
         self.main_button.clicked.connect(lambda: self.clicked.emit(text))
 
         self.plus_button = QPushButton(self.main_button)
-        self.plus_button.setIcon(QIcon(plus_icon_path))
+        self.plus_button.setIcon(QIcon(svg_pixmap(plus_icon_path, plus_icon_size)))
         self.plus_button.setIconSize(plus_icon_size)
         self.plus_button.setFixedSize(QSize(30, 30))
-        self.plus_button.setStyleSheet("""
-            QPushButton {
-                background-color: transparent;
-                border: none;
-                qproperty-iconSize: 24px;
-                padding: 3px;
-            }
-            QPushButton:hover {
-                background-color: #C7E8FF;
-                border-radius: 10px;
-            }
-        """)
+        self.plus_button.setObjectName("section_plus_button")
         self.plus_button.move(298 - 30 - 10, (48 - 30) // 2)
         self.plus_button.clicked.connect(lambda: self.plus_clicked.emit(text + "_add"))
 
@@ -67,42 +65,7 @@ class CustomButtonWidget(QWidget):
         super().resizeEvent(event)
 
     def set_active(self, active):
-        if active:
-            self.main_button.setStyleSheet("""
-                QPushButton {
-                    background-color: #C7E8FF;
-                    color: #636363;
-                    border-radius: 5px;
-                    border: 1px solid #ECECEC;
-                    padding: 5px 10px;
-                    font-size: 14px;
-                    text-align: left;
-                    padding-right: 50px;
-                    position: relative;
-                }
-                QPushButton:hover {
-                    background-color: #C7E8FF;
-                    color: #636363;
-                }
-            """)
-        else:
-            self.main_button.setStyleSheet("""
-                QPushButton {
-                    background-color: #FFFFFF;
-                    color: #636363;
-                    border-radius: 5px;
-                    border: 1px solid #ECECEC;
-                    padding: 5px 10px;
-                    font-size: 14px;
-                    text-align: left;
-                    padding-right: 50px;
-                    position: relative;
-                }
-                QPushButton:hover {
-                    background-color: #C7E8FF;
-                    color: #636363;
-                }
-            """)
+        set_style_state(self.main_button, "active", active)
 
 # Базовый диалог
 class BaseDialog(QDialog):
@@ -126,6 +89,16 @@ class BaseDialog(QDialog):
         buttons_layout.addWidget(cancel_button)
         self.layout.addRow(buttons_layout)
 
+    def accept(self):
+        # Запись не сохраняется, пока поле выбора животного не указывает на конкретное животное
+        for picker in self.findChildren(AnimalPicker):
+            error = picker.error()
+            if error:
+                QMessageBox.warning(self, "Ошибка", error)
+                picker.setFocus()
+                return
+        super().accept()
+
 # Диалог для добавления вида
 class SpeciesDialog(BaseDialog):
     def __init__(self, parent=None, species=None):
@@ -186,19 +159,25 @@ class AnimalDialog(BaseDialog):
             self.date_of_arrival.setDate(QDate.fromString(str(animal.date_of_arrival), "yyyy-MM-dd"))
             self.sex.setCurrentText(animal.sex)
 
+    def values(self):
+        return {
+            "name": self.name.text(),
+            "species_id": self.species.currentData(),
+            "enclosure_id": self.enclosure.currentData(),
+            "date_of_birth": self.date_of_birth.date().toPython(),
+            "date_of_arrival": self.date_of_arrival.date().toPython(),
+            "sex": self.sex.currentText(),
+        }
+
     def load_species(self):
         self.species.clear()
-        with get_session() as session:
-            species_list = session.query(Species).all()
-            for sp in species_list:
-                self.species.addItem(sp.name, sp.id)
+        for species_id, name in lookup(Species):
+            self.species.addItem(name, species_id)
 
     def load_enclosures(self):
         self.enclosure.clear()
-        with get_session() as session:
-            enclosures = session.query(Enclosure).all()
-            for enc in enclosures:
-                self.enclosure.addItem(enc.name, enc.id)
+        for enclosure_id, name in lookup(Enclosure):
+            self.enclosure.addItem(name, enclosure_id)
 
     def add_species(self):
         species_dialog = SpeciesDialog(self)
@@ -245,12 +224,18 @@ class EmployeeDialog(BaseDialog):
             self.phone.setText(employee.phone)
             self.hire_date.setDate(QDate.fromString(str(employee.hire_date), "yyyy-MM-dd"))
 
+    def values(self):
+        return {
+            "name": self.name.text(),
+            "position_id": self.position.currentData(),
+            "phone": self.phone.text(),
+            "hire_date": self.hire_date.date().toPython(),
+        }
+
     def load_positions(self):
         self.position.clear()
-        with get_session() as session:
-            positions = session.query(Position).all()
-            for pos in positions:
-                self.position.addItem(pos.name, pos.id)
+        for position_id, name in lookup(Position):
+            self.position.addItem(name, position_id)
 
     def add_position(self):
         position_dialog = PositionDialog(self)
@@ -287,6 +272,14 @@ class EnclosureDialog(BaseDialog):
             self.location.setText(enclosure.location)
             self.description.setText(enclosure.description)
 
+    def values(self):
+        return {
+            "name": self.name.text(),
+            "size": self.size.value(),
+            "location": self.location.text(),
+            "description": self.description.text(),
+        }
+
 # Диалог для кормов
 class FeedDialog(BaseDialog):
     def __init__(self, parent=None, feed=None):
@@ -301,16 +294,18 @@ class FeedDialog(BaseDialog):
             self.name.setText(feed.name)
             self.description.setText(feed.description)
 
+    def values(self):
+        return {"name": self.name.text(), "description": self.description.text()}
+
 # Диалог для кормления
 class AnimalFeedDialog(BaseDialog):
     def __init__(self, parent=None, animal_feed=None):
         super().__init__(parent, "Кормление")
-        self.animal = QComboBox()
+        self.animal = AnimalPicker()
         self.feed = QComboBox()
         self.daily_amount = QDoubleSpinBox()
         self.daily_amount.setRange(0, 1000)
 
-        self.load_animals()
         self.load_feeds()
 
         feed_layout = QHBoxLayout()
@@ -325,23 +320,21 @@ class AnimalFeedDialog(BaseDialog):
         self.layout.addRow("Суточная норма (кг):", self.daily_amount)
 
         if animal_feed:
-            self.animal.setCurrentIndex(self.animal.findData(animal_feed.animal_id))
+            self.animal.set_animal(animal_feed.animal_id)
             self.feed.setCurrentIndex(self.feed.findData(animal_feed.feed_id))
             self.daily_amount.setValue(animal_feed.daily_amount)
 
-    def load_animals(self):
-        self.animal.clear()
-        with get_session() as session:
-            animals = session.query(Animal).all()
-            for a in animals:
-                self.animal.addItem(a.name, a.id)
+    def values(self):
+        return {
+            "animal_id": self.animal.currentData(),
+            "feed_id": self.feed.currentData(),
+            "daily_amount": self.daily_amount.value(),
+        }
 
     def load_feeds(self):
         self.feed.clear()
-        with get_session() as session:
-            feeds = session.query(Feed).all()
-            for f in feeds:
-                self.feed.addItem(f.name, f.id)
+        for feed_id, name in lookup(Feed):
+            self.feed.addItem(name, feed_id)
 
     def add_feed(self):
         feed_dialog = FeedDialog(self)
@@ -364,49 +357,41 @@ class AnimalFeedDialog(BaseDialog):
 class HealthRecordDialog(BaseDialog):
     def __init__(self, parent=None, health_record=None):
         super().__init__(parent, "Медицинская запись")
-        self.animal = QComboBox()
+        self.animal = AnimalPicker()
         self.checkup_date = QDateEdit()
         self.checkup_date.setCalendarPopup(True)
         self.checkup_date.setDate(QDate.currentDate())
         self.notes = QLineEdit()
 
-        with get_session() as session:
-            animals = session.query(Animal).all()
-            for a in animals:
-                self.animal.addItem(a.name, a.id)
-
         self.layout.addRow("Животное:", self.animal)
         self.layout.addRow("Дата осмотра:", self.checkup_date)
         self.layout.addRow("Заметки:", self.notes)
 
         if health_record:
-            self.animal.setCurrentIndex(self.animal.findData(health_record.animal_id))
+            self.animal.set_animal(health_record.animal_id)
             self.checkup_date.setDate(QDate.fromString(str(health_record.checkup_date), "yyyy-MM-dd"))
             self.notes.setText(health_record.notes)
 
+    def values(self):
+        return {
+            "animal_id": self.animal.currentData(),
+            "checkup_date": self.checkup_date.date().toPython(),
+            "notes": self.notes.text(),
+        }
+
 # Диалог для потомства
 class OffspringDialog(BaseDialog):
     def __init__(self, parent=None, offspring=None):
         super().__init__(parent, "Потомство")
         self.name = QLineEdit()
-        self.mother = QComboBox()
-        self.father = QComboBox()
+        self.mother = AnimalPicker(sex="Female", placeholder="Неизвестно", required=False)
+        self.father = AnimalPicker(sex="Male", placeholder="Неизвестно", required=False)
         self.date_of_birth = QDateEdit()
         self.date_of_birth.setCalendarPopup(True)
         self.date_of_birth.setDate(QDate.currentDate())
         self.sex = QComboBox()
         self.sex.addItems(["Male", "Female"])
 
-        with get_session() as session:
-            animals = session.query(Animal).all()
-            self.mother.addItem("Неизвестно", None)
-            self.father.addItem("Неизвестно", None)
-            for animal in animals:
-                if animal.sex == "Female":
-                    self.mother.addItem(animal.name, animal.id)
-                if animal.sex == "Male":
-                    self.father.addItem(animal.name, animal.id)
-
         self.layout.addRow("Имя:", self.name)
         self.layout.addRow("Мать:", self.mother)
         self.layout.addRow("Отец:", self.father)
@@ -415,33 +400,51 @@ class OffspringDialog(BaseDialog):
 
         if offspring:
             self.name.setText(offspring.name)
-            self.mother.setCurrentIndex(self.mother.findData(offspring.mother_id))
-            self.father.setCurrentIndex(self.father.findData(offspring.father_id))
+            self.mother.set_animal(offspring.mother_id)
+            self.father.set_animal(offspring.father_id)
             self.date_of_birth.setDate(QDate.fromString(str(offspring.date_of_birth), "yyyy-MM-dd"))
             self.sex.setCurrentText(offspring.sex)
 
+    def values(self):
+        return {
+            "name": self.name.text(),
+            "mother_id": self.mother.currentData(),
+            "father_id": self.father.currentData(),
+            "date_of_birth": self.date_of_birth.date().toPython(),
+            "sex": self.sex.currentText(),
+        }
+
 # Диалог для назначения ухаживающих
 class AnimalCaretakerDialog(BaseDialog):
     def __init__(self, parent=None, caretaker=None):
         super().__init__(parent, "Назначение ухаживающего")
         self.employee = QComboBox()
-        self.animal = QComboBox()
+        self.animal = AnimalPicker()
 
-        with get_session() as session:
-            employees = session.query(Employee).all()
-            for emp in employees:
-                self.employee.addItem(emp.name, emp.id)
-
-            animals = session.query(Animal).all()
-            for a in animals:
-                self.animal.addItem(a.name, a.id)
+        for employee_id, name in lookup(Employee):
+            self.employee.addItem(name, employee_id)
 
         self.layout.addRow("Сотрудник:", self.employee)
         self.layout.addRow("Животное:", self.animal)
 
         if caretaker:
             self.employee.setCurrentIndex(self.employee.findData(caretaker.employee_id))
-            self.animal.setCurrentIndex(self.animal.findData(caretaker.animal_id))
+            self.animal.set_animal(caretaker.animal_id)
+
+    def values(self):
+        return {"employee_id": self.employee.currentData(), "animal_id": self.animal.currentData()}
+
+# Диалог записи для каждого раздела главного окна
+DIALOGS = {
+    "Животные": AnimalDialog,
+    "Сотрудники": EmployeeDialog,
+    "Вольеры": EnclosureDialog,
+    "Корма": FeedDialog,
+    "Кормление": AnimalFeedDialog,
+    "Медицина": HealthRecordDialog,
+    "Потомство": OffspringDialog,
+    "Ухаживающие": AnimalCaretakerDialog,
+}
 
 # Главное окно
 class MainWindow(QMainWindow):
@@ -450,130 +453,34 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("Управление зоопарком")
         self.setGeometry(200, 200, 1024, 768)
         self.setMinimumSize(1024, 768)
+        self.db_executor = DbExecutor(self)
+        self.report_queue = ReportQueue(self)
+        self.report_queue.started.connect(self.report_started)
+        self.report_queue.progress.connect(lambda percent: self.report_progress.setValue(percent))
+        self.report_queue.queue_changed.connect(self.update_report_queue)
+        self.report_queue.failed.connect(self.report_failed)
         self.setup_ui()
         self.apply_styles()
-        self.show_animals()
-        self.current_table = self.animals_table
-        self.animals_table.show()
-        self.set_active_button("Животные")
+        self.profiler_panel = ProfilerPanel(self)
+        QShortcut(QKeySequence("F12"), self, self.toggle_profiler_panel)
+        # Данные загружаются, когда окно уже показано и работает цикл событий
+        QTimer.singleShot(0, self.load_first_section)
+
+    def load_first_section(self):
+        startup.mark("показ окна")
+        self.show_section("Животные")
+        self.current_table.model().page_ready.connect(self.first_page_loaded, Qt.SingleShotConnection)
         self.start_auto_refresh()
 
+    def first_page_loaded(self):
+        startup.mark("первые данные")
+        startup.report()
+
+    def toggle_profiler_panel(self):
+        self.profiler_panel.setVisible(not self.profiler_panel.isVisible())
+
     def apply_styles(self):
-        self.setStyleSheet("""
-            QMainWindow { background-color: #F5F6FF; font-family: 'Regular', 'Inter'; }
-            QLabel#logo { padding: 10px; }
-            QLineEdit {
-                background-color: #FFFFFF;
-                border: 1px solid #ECECEC;
-                border-radius: 5px;
-                padding: 10px 15px;
-                font-size: 14px;
-            }
-            #save, #cancel { text-align: center; }
-            QPushButton {
-                background-color: #FFFFFF;
-                color: #636363;
-                border-radius: 5px;
-                border: 1px solid #ECECEC;
-                padding: 5px 10px;
-                font-size: 14px;
-                text-align: left;
-            }
-            QPushButton#report_button {
-                background-color: #FFFFFF;
-                color: #636363;
-                border-radius: 5px;
-                border: 1px solid #ECECEC;
-                padding: 5px 10px;
-                font-size: 14px;
-                text-align: center;
-            }
-            QPushButton#report_button:hover {
-                background-color: #C7E8FF;
-                color: #636363;
-                border: 1px solid #ECECEC;
-            }
-            QPushButton#delete_button {
-                background-color: #FFC1C1;
-                color: #636363;
-                border-radius: 5px;
-                border: 1px solid #ECECEC;
-                text-align: center;
-            }
-            QPushButton#delete_button:hover {
-                background-color: #FF9999;
-                color: #FFFFFF;
-                border: 1px solid #ECECEC;
-            }
-            QPushButton#add_button {
-                background-color: #5FFFD2;
-                color: #636363;
-                border-radius: 5px;
-                border: 1px solid #ECECEC;
-                text-align: center;
-            }
-            QPushButton#add_button:hover {
-                background-color: #00E6A8;
-                color: #FFFFFF;
-                border: 1px solid #ECECEC;
-            }
-            QPushButton#add_species_button, QPushButton#add_position_button, QPushButton#add_feed_button {
-                background-color: #FFFFFF;
-                color: #636363;
-                border: 1px solid #ECECEC;
-                border-radius: 5px;
-                padding: 5px 10px;
-                font-size: 14px;
-            }
-            QPushButton#add_species_button:hover, QPushButton#add_position_button:hover, QPushButton#add_feed_button:hover { 
-                background-color: #C7E8FF; 
-                color: #636363; 
-            }
-            QPushButton:hover { 
-                background-color: #C7E8FF; 
-                color: #636363; 
-            }
-            QTableWidget {
-                background-color: #FFFFFF;
-                border: 1px solid #ECECEC;
-                border-radius: 5px;
-                font-size: 12px;
-                alternate-background-color: #FFFFFF;
-            }
-            QTableWidget::item { 
-                padding: 5px; 
-            }
-            QHeaderView::section {
-                background-color: #C7E8FF;
-                color: #636363;
-                padding: 5px;
-                font-size: 12px;
-            }
-            QHeaderView { 
-                background-color: rgba(0,0,0,0); 
-            }
-            QDialog {
-                background-color: #F5F6FF;
-                border: 1px solid #ECECEC;
-                border-radius: 10px;
-            }
-            QComboBox {
-                background-color: #FFFFFF;
-                border: 1px solid #ECECEC;
-                border-radius: 5px;
-                padding: 5px 10px;
-                font-size: 14px;
-                color: #636363;
-            }
-            QComboBox:hover {
-                background-color: #C7E8FF;
-            }
-            QComboBox QAbstractItemView {
-                color: #636363;
-                background-color: #FFFFFF;
-                selection-background-color: #C7E8FF;
-            }
-        """)
+        apply_theme(QApplication.instance())
 
     def setup_ui(self):
         central_widget = QWidget()
@@ -585,9 +492,7 @@ class MainWindow(QMainWindow):
 
         logo = QLabel()
         logo.setObjectName("logo")
-        logo_icon = QIcon("logo.svg")
-        logo_pixmap = logo_icon.pixmap(QSize(120, 120))
-        logo.setPixmap(logo_pixmap)
+        logo.setPixmap(svg_pixmap("logo.svg", QSize(120, 120)))
         left_layout.addWidget(logo)
 
         self.buttons = []
@@ -618,16 +523,7 @@ class MainWindow(QMainWindow):
 
         self.report_combo = QComboBox()
         self.report_combo.setFixedSize(298, 48)
-        self.report_combo.addItems([
-            "Отчёт по животным",
-            "Отчёт по сотрудникам",
-            "Отчёт по вольерам",
-            "Отчёт по кормам",
-            "Отчёт по кормлению",
-            "Отчёт по медицинским записям",
-            "Отчёт по родословной",
-            "Отчёт по ухаживающим",
-        ])
+        self.report_combo.addItems(REPORT_TYPES)
         self.report_combo.setCurrentText("Отчёт по животным")
 
         self.report_button = QPushButton("Сгенерировать")
@@ -635,9 +531,28 @@ class MainWindow(QMainWindow):
         self.report_button.setFixedSize(298, 48)
         self.report_button.clicked.connect(self.generate_report)
 
+        self.report_all_button = QPushButton("Сгенерировать все")
+        self.report_all_button.setObjectName("report_button")
+        self.report_all_button.setFixedSize(298, 48)
+        self.report_all_button.clicked.connect(self.generate_all_reports)
+
+        # Ход построения отчётов: текущий отчёт, число отчётов в очереди и отмена
+        self.report_status = QLabel()
+        self.report_progress = QProgressBar()
+        self.report_progress.setFixedWidth(298)
+        self.report_progress.setRange(0, 100)
+        self.report_cancel_button = QPushButton("Отменить отчёт")
+        self.report_cancel_button.setFixedSize(298, 38)
+        self.report_cancel_button.clicked.connect(self.report_queue.cancel_current)
+
         report_layout.addWidget(self.report_combo)
         report_layout.addWidget(self.report_button)
+        report_layout.addWidget(self.report_all_button)
+        report_layout.addWidget(self.report_status)
+        report_layout.addWidget(self.report_progress)
+        report_layout.addWidget(self.report_cancel_button)
         left_layout.addWidget(report_panel)
+        self.update_report_queue(0)
 
         left_layout.addStretch()
         main_layout.addWidget(left_panel)
@@ -665,58 +580,74 @@ class MainWindow(QMainWindow):
         self.add_button.setFixedHeight(38)
         self.add_button.clicked.connect(self.add_item)
 
+        self.export_button = QPushButton("Экспорт")
+        self.export_button.setObjectName("export_button")
+        self.export_button.setFixedHeight(38)
+        self.export_button.clicked.connect(self.export_section)
+
+        self.import_button = QPushButton("Импорт")
+        self.import_button.setObjectName("import_button")
+        self.import_button.setFixedHeight(38)
+        self.import_button.clicked.connect(self.import_section)
+
         buttons_layout.addWidget(self.delete_button)
+        buttons_layout.addWidget(self.export_button)
+        buttons_layout.addWidget(self.import_button)
         buttons_layout.addWidget(self.add_button)
         right_layout.addWidget(buttons_widget)
 
-        self.animals_table = QTableWidget()
-        self.employees_table = QTableWidget()
-        self.enclosures_table = QTableWidget()
-        self.feeds_table = QTableWidget()
-        self.feeding_table = QTableWidget()
-        self.health_table = QTableWidget()
-        self.offspring_table = QTableWidget()
-        self.caretaker_table = QTableWidget()
-
-        for table in [self.animals_table, self.employees_table, self.enclosures_table,
-                      self.feeds_table, self.feeding_table, self.health_table,
-                      self.offspring_table, self.caretaker_table]:
-            table.setAlternatingRowColors(True)
-            table.setEditTriggers(QTableWidget.NoEditTriggers)
-            table.doubleClicked.connect(self.edit_item_on_double_click)
-            right_layout.addWidget(table)
+        # Таблицы разделов создаются при первом открытии раздела (section_table)
+        self.right_layout = right_layout
+        self.tables = {}
 
-        self.search_input.textChanged.connect(self.search_items)
+        # Поиск запускается после паузы в наборе, а не на каждое нажатие клавиши
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(300)
+        self.search_timer.timeout.connect(self.search_items)
+        self.search_input.textChanged.connect(self.search_timer.start)
 
         main_layout.addWidget(right_panel)
         main_layout.setStretch(1, 2)
 
-        self.hide_all_tables()
         self.current_table = None
 
+    def section_table(self, section):
+        table = self.tables.get(section)
+        if table is None:
+            table = QTableView()
+            model = SectionTableModel(SECTIONS[section].headers, self.db_executor, table)
+            model.load_failed.connect(self.show_load_error)
+            table.setModel(model)
+            table.setAlternatingRowColors(True)
+            table.setEditTriggers(QTableView.NoEditTriggers)
+            table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+            table.doubleClicked.connect(self.edit_item_on_double_click)
+            table.hide()
+            self.right_layout.addWidget(table)
+            self.tables[section] = table
+        return table
+
+    def show_load_error(self, error):
+        QMessageBox.critical(self, "Ошибка", f"Ошибка при загрузке данных: {str(error)}")
+
     def start_auto_refresh(self):
+        # Подключение LISTEN выполняется в фоне, проверка изменений начинается, когда оно готово
+        self.db_executor.submit("change_listener", ChangeListener, on_result=self.change_listener_ready)
+
+    def change_listener_ready(self, listener):
+        self.change_listener = listener
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.refresh_current_table)
-        self.timer.start(5000)  # Обновление каждые 5 секунд
+        self.timer.start(5000)  # Проверка изменений каждые 5 секунд
 
     def refresh_current_table(self):
-        if self.current_table:
-            if self.current_table == self.animals_table:
-                self.show_animals()
-            elif self.current_table == self.employees_table:
-                self.show_employees()
-            elif self.current_table == self.enclosures_table:
-                self.show_enclosures()
-            elif self.current_table == self.feeds_table:
-                self.show_feeds()
-            elif self.current_table == self.feeding_table:
-                self.show_feeding()
-            elif self.current_table == self.health_table:
-                self.show_health()
-            elif self.current_table == self.offspring_table:
-                self.show_offspring()
-            elif self.current_table == self.caretaker_table:
-                self.show_caretakers()
+        # Перезапрашиваются только изменившиеся строки, выделение и прокрутка сохраняются
+        with profiler.action("Обновление таблицы"):
+            changes = self.change_listener.poll()
+            invalidate_changes(changes)
+            if self.current_table:
+                self.current_table.model().refresh(changes)
 
     def generate_report(self):
         report_type = self.report_combo.currentText()
@@ -724,659 +655,194 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Ошибка", "Пожалуйста, выберите тип отчёта.")
             return
 
-        try:
-            with get_session() as session:
-                pdf = FPDF()
-                pdf.set_auto_page_break(auto=True, margin=15)
-                pdf.add_page()
-
-                pdf.add_font('FreeSans', '', 'FreeSans.ttf', uni=True)
-                pdf.set_font('FreeSans', '', 16)
-
-                pdf.cell(200, 10, f"{report_type}", ln=True, align='C')
-                pdf.ln(10)
-
-                pdf.set_font('FreeSans', '', 12)
-
-                if report_type == "Отчёт по животным":
-                    animals = session.query(Animal).all()
-                    for animal in animals:
-                        pdf.cell(200, 10, f"Имя: {animal.name}", ln=True)
-                        pdf.cell(200, 10, f"Вид: {animal.fk_species.name if animal.fk_species else 'Не указан'}", ln=True)
-                        pdf.cell(200, 10, f"Вольер: {animal.fk_enclosure.name if animal.fk_enclosure else 'Не указан'}", ln=True)
-                        pdf.cell(200, 10, f"Дата рождения: {animal.date_of_birth}", ln=True)
-                        pdf.cell(200, 10, f"Дата прибытия: {animal.date_of_arrival}", ln=True)
-                        pdf.cell(200, 10, f"Пол: {animal.sex}", ln=True)
-                        pdf.ln(5)
-                    pdf.ln(10)
-                    pdf.set_font('FreeSans', '', 14)
-                    pdf.cell(0, 10, f"Общее количество животных: {len(animals)}", ln=True, align='R')
-
-                elif report_type == "Отчёт по сотрудникам":
-                    employees = session.query(Employee).all()
-                    for emp in employees:
-                        pdf.cell(200, 10, f"ФИО: {emp.name}", ln=True)
-                        pdf.cell(200, 10, f"Должность: {emp.fk_position.name if emp.fk_position else 'Не указана'}", ln=True)
-                        pdf.cell(200, 10, f"Телефон: {emp.phone}", ln=True)
-                        pdf.cell(200, 10, f"Дата найма: {emp.hire_date}", ln=True)
-                        pdf.ln(5)
-                    pdf.ln(10)
-                    pdf.set_font('FreeSans', '', 14)
-                    pdf.cell(0, 10, f"Общее количество сотрудников: {len(employees)}", ln=True, align='R')
-
-                elif report_type == "Отчёт по вольерам":
-                    enclosures = session.query(Enclosure).all()
-                    for enc in enclosures:
-                        pdf.cell(200, 10, f"Название: {enc.name}", ln=True)
-                        pdf.cell(200, 10, f"Размер: {enc.size} м²", ln=True)
-                        pdf.cell(200, 10, f"Местоположение: {enc.location}", ln=True)
-                        pdf.cell(200, 10, f"Описание: {enc.description if enc.description else 'Нет описания'}", ln=True)
-                        pdf.ln(5)
-                    pdf.ln(10)
-                    pdf.set_font('FreeSans', '', 14)
-                    pdf.cell(0, 10, f"Общее количество вольеров: {len(enclosures)}", ln=True, align='R')
-
-                elif report_type == "Отчёт по кормам":
-                    feeds = session.query(Feed).all()
-                    for feed in feeds:
-                        pdf.cell(200, 10, f"Название: {feed.name}", ln=True)
-                        pdf.cell(200, 10, f"Описание: {feed.description if feed.description else 'Нет описания'}", ln=True)
-                        pdf.ln(5)
-                    pdf.ln(10)
-                    pdf.set_font('FreeSans', '', 14)
-                    pdf.cell(0, 10, f"Общее количество кормов: {len(feeds)}", ln=True, align='R')
-
-                elif report_type == "Отчёт по кормлению":
-                    feedings = session.query(AnimalFeed).all()
-                    total_daily_amount = 0
-                    for feed in feedings:
-                        pdf.cell(200, 10, f"Животное: {feed.fk_animal.name if feed.fk_animal else 'Не указано'}", ln=True)
-                        pdf.cell(200, 10, f"Корм: {feed.fk_feed.name if feed.fk_feed else 'Не указано'}", ln=True)
-                        pdf.cell(200, 10, f"Суточная норма: {feed.daily_amount} кг", ln=True)
-                        total_daily_amount += feed.daily_amount
-                        pdf.ln(5)
-                    pdf.ln(10)
-                    pdf.set_font('FreeSans', '', 14)
-                    pdf.cell(0, 10, f"Общее количество корма в сутки: {total_daily_amount:.2f} кг", ln=True, align='R')
-
-                elif report_type == "Отчёт по медицинским записям":
-                    health_records = session.query(HealthRecord).all()
-                    for record in health_records:
-                        pdf.cell(200, 10, f"Животное: {record.fk_animal.name if record.fk_animal else 'Не указано'}", ln=True)
-                        pdf.cell(200, 10, f"Дата осмотра: {record.checkup_date}", ln=True)
-                        pdf.cell(200, 10, f"Заметки: {record.notes if record.notes else 'Нет заметок'}", ln=True)
-                        pdf.ln(5)
-                    pdf.ln(10)
-                    pdf.set_font('FreeSans', '', 14)
-                    pdf.cell(0, 10, f"Общее количество медицинских записей: {len(health_records)}", ln=True, align='R')
-
-                elif report_type == "Отчёт по родословной":
-                    animal_name, ok = QInputDialog.getText(self, "Имя животного", "Введите имя животного для построения родословной:")
-                    if not ok or not animal_name:
-                        QMessageBox.warning(self, "Ошибка", "Имя животного не введено.")
-                        return
-
-                    animal = session.query(Animal).filter(Animal.name.ilike(f"%{animal_name}%")).first()
-                    if not animal:
-                        QMessageBox.warning(self, "Ошибка", f"Животное с именем '{animal_name}' не найдено.")
-                        return
-
-                    pedigree = self.build_pedigree(animal, session, depth=0)
-                    pdf.multi_cell(200, 10, f"Родословная для {animal.name}:\n{pedigree}")
-
-                elif report_type == "Отчёт по ухаживающим":
-                    caretakers = session.query(AnimalCaretaker).all()
-                    for caretaker in caretakers:
-                        pdf.cell(200, 10, f"Сотрудник: {caretaker.fk_employee.name if caretaker.fk_employee else 'Не указано'}", ln=True)
-                        pdf.cell(200, 10, f"Животное: {caretaker.fk_animal.name if caretaker.fk_animal else 'Не указано'}", ln=True)
-                        pdf.ln(5)
-                    pdf.ln(10)
-                    pdf.set_font('FreeSans', '', 14)
-                    pdf.cell(0, 10, f"Общее количество назначений: {len(caretakers)}", ln=True, align='R')
-
-                report_filename = report_type.lower().replace(" ", "_").replace("отчёт_", "") + "_report.pdf"
-                pdf_output_path, _ = QFileDialog.getSaveFileName(
-                    self, "Сохранить отчёт", report_filename, "PDF Files (*.pdf)"
-                )
-                if not pdf_output_path:
-                    return
-
-                pdf.output(pdf_output_path)
+        animal_name = None
+        if report_type == "Отчёт по родословной":
+            animal_name, ok = QInputDialog.getText(self, "Имя животного", "Введите имя животного для построения родословной:")
+            if not ok or not animal_name:
+                QMessageBox.warning(self, "Ошибка", "Имя животного не введено.")
+                return
+
+        # Путь запрашивается заранее: отчёт строится и записывается в файл в фоне,
+        # а пока он в очереди, можно заказывать следующие и работать с таблицами
+        pdf_output_path, _ = QFileDialog.getSaveFileName(
+            self, "Сохранить отчёт", report_filename(report_type), "PDF Files (*.pdf)"
+        )
+        if not pdf_output_path:
+            return
+        with profiler.action(f"Отчёт: {report_type}"):
+            self.report_queue.enqueue(report_type, pdf_output_path, animal_name)
 
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Ошибка при генерации отчёта: {str(e)}")
+    def generate_all_reports(self):
+        directory = QFileDialog.getExistingDirectory(self, "Каталог для отчётов")
+        if not directory:
+            return
+        animal_name, ok = QInputDialog.getText(
+            self, "Имя животного", "Имя животного для родословной (оставьте пустым, чтобы пропустить):")
+        if not ok:
+            return
 
-    def build_pedigree(self, animal, session, depth=0, max_depth=5):
-        if depth > max_depth:
-            return "  " * depth + "... (дальше не отображается)\n"
+        # Отчёты строятся параллельно в отдельных процессах, а ожидание их
+        # завершения вынесено из GUI-потока
+        self.report_all_button.setEnabled(False)
+        self.db_executor.submit("all_reports", export_all_reports, directory, animal_name or None,
+                                on_result=self.all_reports_done, on_error=self.all_reports_failed)
+
+    def all_reports_done(self, results):
+        self.report_all_button.setEnabled(True)
+        errors = [f"{report_type}: {result}" for report_type, result in results if isinstance(result, Exception)]
+        if errors:
+            QMessageBox.warning(self, "Ошибка", "Не удалось построить отчёты:\n" + "\n".join(errors))
+        else:
+            QMessageBox.information(self, "Отчёты", f"Построено отчётов: {len(results)}")
+
+    def all_reports_failed(self, error):
+        self.report_all_button.setEnabled(True)
+        QMessageBox.critical(self, "Ошибка", f"Ошибка при генерации отчётов: {str(error)}")
+
+    def export_section(self):
+        if not self.current_table:
+            QMessageBox.warning(self, "Ошибка", "Выберите таблицу для экспорта")
+            return
+        model = self.current_table.model()
+        section = model.section
+        path, file_filter = QFileDialog.getSaveFileName(
+            self, "Экспорт", export_filename(section.name, ""), ";;".join(EXPORT_FORMATS)
+        )
+        if not path:
+            return
+
+        # Выгружаются строки с учётом текущего поиска; запись идёт в фоне
+        self.export_button.setEnabled(False)
+        with profiler.action(f"Экспорт: {section.name}"):
+            self.db_executor.submit("export", EXPORT_FORMATS.get(file_filter, EXPORT_FORMATS["CSV (*.csv)"]),
+                                    section, path, model.text,
+                                    on_result=self.export_done, on_error=self.export_failed)
+
+    def export_done(self, count):
+        self.export_button.setEnabled(True)
+        QMessageBox.information(self, "Экспорт", f"Выгружено строк: {count}")
+
+    def export_failed(self, error):
+        self.export_button.setEnabled(True)
+        QMessageBox.critical(self, "Ошибка", f"Ошибка при экспорте: {str(error)}")
+
+    def import_section(self):
+        section = self.current_table.model().section if self.current_table else None
+        if section is None or section.name not in IMPORTERS:
+            QMessageBox.warning(self, "Ошибка", "Импорт доступен для разделов: " + ", ".join(IMPORTERS))
+            return
+        path, _ = QFileDialog.getOpenFileName(self, "Импорт", "", "CSV, JSON (*.csv *.json)")
+        if not path:
+            return
 
-        indent = "  " * depth
-        result = f"{indent}{animal.name} ({animal.sex}, {animal.date_of_birth})\n"
+        self.import_button.setEnabled(False)
+        section_name = section.name
+        with profiler.action(f"Импорт: {section_name}"):
+            self.db_executor.submit("import", import_file, section_name, path,
+                                    on_result=lambda result: self.import_done(section_name, result),
+                                    on_error=self.import_failed)
+
+    def import_done(self, section_name, result):
+        self.import_button.setEnabled(True)
+        QMessageBox.information(self, "Импорт", f"Загружено записей: {result.count} за {result.seconds:.2f} с "
+                                                f"({result.rate():.0f} записей/с)")
+        # Перечитывается раздел, в который шёл импорт, даже если пользователь уже перешёл в другой
+        table = self.tables.get(section_name)
+        if table is not None:
+            self.load_data(section_name, table)
+
+    def import_failed(self, error):
+        self.import_button.setEnabled(True)
+        if isinstance(error, BulkImportError):
+            details = "\n".join(error.errors[:20])
+            if len(error.errors) > 20:
+                details += f"\n… и ещё {len(error.errors) - 20}"
+            QMessageBox.warning(self, "Ошибка", f"Файл не загружен, исправьте ошибки:\n{details}")
+        else:
+            QMessageBox.critical(self, "Ошибка", f"Ошибка при импорте: {str(error)}")
 
-        mother_record = session.query(Offspring).filter(Offspring.name == animal.name).first()
-        if mother_record and mother_record.fk_mother:
-            result += f"{indent}Мать:\n"
-            result += self.build_pedigree(mother_record.fk_mother, session, depth + 1, max_depth)
+    def report_started(self, report_type):
+        self.report_progress.setValue(0)
+        self.report_progress.setFormat(f"{report_type}: %p%")
 
-        if mother_record and mother_record.fk_father:
-            result += f"{indent}Отец:\n"
-            result += self.build_pedigree(mother_record.fk_father, session, depth + 1, max_depth)
+    def update_report_queue(self, count):
+        self.report_status.setText(f"Отчётов в очереди: {count}")
+        self.report_status.setVisible(count > 0)
+        self.report_progress.setVisible(count > 0)
+        self.report_cancel_button.setVisible(count > 0)
 
-        return result
+    def report_failed(self, report_type, error):
+        if isinstance(error, ReportError):
+            QMessageBox.warning(self, "Ошибка", str(error))
+        else:
+            QMessageBox.critical(self, "Ошибка", f"Ошибка при генерации отчёта «{report_type}»: {str(error)}")
 
     def show_section(self, section):
-        self.hide_all_tables()
-        if section == "Животные":
-            self.current_table = self.animals_table
-            self.show_animals()
-        elif section == "Сотрудники":
-            self.current_table = self.employees_table
-            self.show_employees()
-        elif section == "Вольеры":
-            self.current_table = self.enclosures_table
-            self.show_enclosures()
-        elif section == "Корма":
-            self.current_table = self.feeds_table
-            self.show_feeds()
-        elif section == "Кормление":
-            self.current_table = self.feeding_table
-            self.show_feeding()
-        elif section == "Медицина":
-            self.current_table = self.health_table
-            self.show_health()
-        elif section == "Потомство":
-            self.current_table = self.offspring_table
-            self.show_offspring()
-        elif section == "Ухаживающие":
-            self.current_table = self.caretaker_table
-            self.show_caretakers()
-        self.current_table.show()
-        self.set_active_button(section)
+        with profiler.action(f"Раздел: {section}"):
+            if self.current_table is not None:
+                self.current_table.hide()
+            self.current_table = self.section_table(section)
+            self.load_data(section, self.current_table)
+            self.current_table.show()
+            self.set_active_button(section)
 
     def set_active_button(self, active_section):
         for button_widget in self.buttons:
-            button_widget.set_active(False)
-        for button_widget in self.buttons:
-            if button_widget.main_button.text() == active_section:
-                button_widget.set_active(True)
-                break
+            button_widget.set_active(button_widget.main_button.text() == active_section)
 
     def add_item_from_plus(self, action):
         if action.endswith("_add"):
-            section = action[:-4]
-            if section == "Животные":
-                self.current_table = self.animals_table
-                dialog = AnimalDialog(self)
-                if dialog.exec():
-                    with get_session() as session:
-                        new_animal = Animal(
-                            name=dialog.name.text(),
-                            species_id=dialog.species.currentData(),
-                            enclosure_id=dialog.enclosure.currentData(),
-                            date_of_birth=dialog.date_of_birth.date().toPython(),
-                            date_of_arrival=dialog.date_of_arrival.date().toPython(),
-                            sex=dialog.sex.currentText()
-                        )
-                        session.add(new_animal)
-                        session.commit()
-                        self.show_animals()
-            elif section == "Сотрудники":
-                self.current_table = self.employees_table
-                dialog = EmployeeDialog(self)
-                if dialog.exec():
-                    with get_session() as session:
-                        new_employee = Employee(
-                            name=dialog.name.text(),
-                            position_id=dialog.position.currentData(),
-                            phone=dialog.phone.text(),
-                            hire_date=dialog.hire_date.date().toPython()
-                        )
-                        session.add(new_employee)
-                        session.commit()
-                        self.show_employees()
-            elif section == "Вольеры":
-                self.current_table = self.enclosures_table
-                dialog = EnclosureDialog(self)
-                if dialog.exec():
-                    with get_session() as session:
-                        new_enclosure = Enclosure(
-                            name=dialog.name.text(),
-                            size=dialog.size.value(),
-                            location=dialog.location.text(),
-                            description=dialog.description.text()
-                        )
-                        session.add(new_enclosure)
-                        session.commit()
-                        self.show_enclosures()
-            elif section == "Корма":
-                self.current_table = self.feeds_table
-                dialog = FeedDialog(self)
-                if dialog.exec():
-                    with get_session() as session:
-                        new_feed = Feed(
-                            name=dialog.name.text(),
-                            description=dialog.description.text()
-                        )
-                        session.add(new_feed)
-                        session.commit()
-                        self.show_feeds()
-            elif section == "Кормление":
-                self.current_table = self.feeding_table
-                dialog = AnimalFeedDialog(self)
-                if dialog.exec():
-                    with get_session() as session:
-                        new_feeding = AnimalFeed(
-                            animal_id=dialog.animal.currentData(),
-                            feed_id=dialog.feed.currentData(),
-                            daily_amount=dialog.daily_amount.value()
-                        )
-                        session.add(new_feeding)
-                        session.commit()
-                        self.show_feeding()
-            elif section == "Медицина":
-                self.current_table = self.health_table
-                dialog = HealthRecordDialog(self)
-                if dialog.exec():
-                    with get_session() as session:
-                        new_health = HealthRecord(
-                            animal_id=dialog.animal.currentData(),
-                            checkup_date=dialog.checkup_date.date().toPython(),
-                            notes=dialog.notes.text()
-                        )
-                        session.add(new_health)
-                        session.commit()
-                        self.show_health()
-            elif section == "Потомство":
-                self.current_table = self.offspring_table
-                dialog = OffspringDialog(self)
-                if dialog.exec():
-                    with get_session() as session:
-                        new_offspring = Offspring(
-                            name=dialog.name.text(),
-                            mother_id=dialog.mother.currentData(),
-                            father_id=dialog.father.currentData(),
-                            date_of_birth=dialog.date_of_birth.date().toPython(),
-                            sex=dialog.sex.currentText()
-                        )
-                        session.add(new_offspring)
-                        session.commit()
-                        self.show_offspring()
-            elif section == "Ухаживающие":
-                self.current_table = self.caretaker_table
-                dialog = AnimalCaretakerDialog(self)
-                if dialog.exec():
-                    with get_session() as session:
-                        new_caretaker = AnimalCaretaker(
-                            employee_id=dialog.employee.currentData(),
-                            animal_id=dialog.animal.currentData()
-                        )
-                        session.add(new_caretaker)
-                        session.commit()
-                        self.show_caretakers()
-
-    def load_data(self, session, model, table_widget, headers, data_function):
-        self.current_items = session.query(model).all()
-        table_widget.setRowCount(len(self.current_items))
-        table_widget.setColumnCount(len(headers))
-        table_widget.setHorizontalHeaderLabels(headers)
-        for row, item in enumerate(self.current_items):
-            for col, value in enumerate(data_function(item)):
-                table_widget.setItem(row, col, QTableWidgetItem(str(value)))
-        table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-
-    def show_animals(self):
-        with get_session() as session:
-            headers = ["Имя", "Вид", "Вольер", "Дата рождения", "Дата прибытия", "Пол"]
-            def get_animal_data(animal):
-                return [
-                    animal.name,
-                    animal.fk_species.name if animal.fk_species else "",
-                    animal.fk_enclosure.name if animal.fk_enclosure else "",
-                    animal.date_of_birth,
-                    animal.date_of_arrival,
-                    animal.sex
-                ]
-            self.load_data(session, Animal, self.animals_table, headers, get_animal_data)
-            self.set_active_button("Животные")
-
-    def show_employees(self):
-        with get_session() as session:
-            headers = ["ФИО", "Должность", "Телефон", "Дата найма"]
-            def get_employee_data(employee):
-                return [
-                    employee.name,
-                    employee.fk_position.name if employee.fk_position else "",
-                    employee.phone,
-                    employee.hire_date
-                ]
-            self.load_data(session, Employee, self.employees_table, headers, get_employee_data)
-            self.set_active_button("Сотрудники")
-
-    def show_enclosures(self):
-        with get_session() as session:
-            headers = ["Название", "Размер (m²)", "Местоположение", "Описание"]
-            def get_enclosure_data(enclosure):
-                return [enclosure.name, enclosure.size, enclosure.location, enclosure.description]
-            self.load_data(session, Enclosure, self.enclosures_table, headers, get_enclosure_data)
-            self.set_active_button("Вольеры")
-
-    def show_feeds(self):
-        with get_session() as session:
-            headers = ["Название", "Описание"]
-            def get_feed_data(feed):
-                return [feed.name, feed.description]
-            self.load_data(session, Feed, self.feeds_table, headers, get_feed_data)
-            self.set_active_button("Корма")
-
-    def show_feeding(self):
-        with get_session() as session:
-            headers = ["Животное", "Корм", "Суточная норма (кг)"]
-            def get_feeding_data(animal_feed):
-                return [
-                    animal_feed.fk_animal.name if animal_feed.fk_animal else "",
-                    animal_feed.fk_feed.name if animal_feed.fk_feed else "",
-                    animal_feed.daily_amount
-                ]
-            self.load_data(session, AnimalFeed, self.feeding_table, headers, get_feeding_data)
-            self.set_active_button("Кормление")
-
-    def show_health(self):
-        with get_session() as session:
-            headers = ["Животное", "Дата осмотра", "Заметки"]
-            def get_health_data(health_record):
-                return [
-                    health_record.fk_animal.name if health_record.fk_animal else "",
-                    health_record.checkup_date,
-                    health_record.notes
-                ]
-            self.load_data(session, HealthRecord, self.health_table, headers, get_health_data)
-            self.set_active_button("Медицина")
-
-    def show_offspring(self):
-        with get_session() as session:
-            headers = ["Имя", "Мать", "Отец", "Дата рождения", "Пол"]
-            def get_offspring_data(offspring):
-                return [
-                    offspring.name,
-                    offspring.fk_mother.name if offspring.fk_mother else "Неизвестно",
-                    offspring.fk_father.name if offspring.fk_father else "Неизвестно",
-                    offspring.date_of_birth,
-                    offspring.sex
-                ]
-            self.load_data(session, Offspring, self.offspring_table, headers, get_offspring_data)
-            self.set_active_button("Потомство")
-
-    def show_caretakers(self):
-        with get_session() as session:
-            headers = ["Сотрудник", "Животное"]
-            def get_caretaker_data(caretaker):
-                return [
-                    caretaker.fk_employee.name if caretaker.fk_employee else "",
-                    caretaker.fk_animal.name if caretaker.fk_animal else ""
-                ]
-            self.load_data(session, AnimalCaretaker, self.caretaker_table, headers, get_caretaker_data)
-            self.set_active_button("Ухаживающие")
-
-    def hide_all_tables(self):
-        for table in [self.animals_table, self.employees_table, self.enclosures_table,
-                      self.feeds_table, self.feeding_table, self.health_table,
-                      self.offspring_table, self.caretaker_table]:
-            table.hide()
+            self.create_item(action[:-4])
+
+    def load_data(self, section, table_widget, text=None):
+        table_widget.model().set_source(SECTIONS[section], text)
 
     def add_item(self):
-        with get_session() as session:
+        if self.current_table:
+            self.create_item(self.current_table.model().section.name)
+
+    def create_item(self, section):
+        # Действие - только открытие диалога: пока он открыт, запросы относятся
+        # к поиску в нём и к обновлению таблицы
+        with profiler.action(f"Диалог: {section}"):
+            dialog = DIALOGS[section](self)
+        if dialog.exec():
             try:
-                if self.current_table == self.animals_table:
-                    dialog = AnimalDialog(self)
-                    if dialog.exec():
-                        new_animal = Animal(
-                            name=dialog.name.text(),
-                            species_id=dialog.species.currentData(),
-                            enclosure_id=dialog.enclosure.currentData(),
-                            date_of_birth=dialog.date_of_birth.date().toPython(),
-                            date_of_arrival=dialog.date_of_arrival.date().toPython(),
-                            sex=dialog.sex.currentText()
-                        )
-                        session.add(new_animal)
-                        session.commit()
-                        self.show_animals()
-                elif self.current_table == self.employees_table:
-                    dialog = EmployeeDialog(self)
-                    if dialog.exec():
-                        new_employee = Employee(
-                            name=dialog.name.text(),
-                            position_id=dialog.position.currentData(),
-                            phone=dialog.phone.text(),
-                            hire_date=dialog.hire_date.date().toPython()
-                        )
-                        session.add(new_employee)
-                        session.commit()
-                        self.show_employees()
-                elif self.current_table == self.enclosures_table:
-                    dialog = EnclosureDialog(self)
-                    if dialog.exec():
-                        new_enclosure = Enclosure(
-                            name=dialog.name.text(),
-                            size=dialog.size.value(),
-                            location=dialog.location.text(),
-                            description=dialog.description.text()
-                        )
-                        session.add(new_enclosure)
-                        session.commit()
-                        self.show_enclosures()
-                elif self.current_table == self.feeds_table:
-                    dialog = FeedDialog(self)
-                    if dialog.exec():
-                        new_feed = Feed(
-                            name=dialog.name.text(),
-                            description=dialog.description.text()
-                        )
-                        session.add(new_feed)
-                        session.commit()
-                        self.show_feeds()
-                elif self.current_table == self.feeding_table:
-                    dialog = AnimalFeedDialog(self)
-                    if dialog.exec():
-                        new_feeding = AnimalFeed(
-                            animal_id=dialog.animal.currentData(),
-                            feed_id=dialog.feed.currentData(),
-                            daily_amount=dialog.daily_amount.value()
-                        )
-                        session.add(new_feeding)
-                        session.commit()
-                        self.show_feeding()
-                elif self.current_table == self.health_table:
-                    dialog = HealthRecordDialog(self)
-                    if dialog.exec():
-                        new_health = HealthRecord(
-                            animal_id=dialog.animal.currentData(),
-                            checkup_date=dialog.checkup_date.date().toPython(),
-                            notes=dialog.notes.text()
-                        )
-                        session.add(new_health)
-                        session.commit()
-                        self.show_health()
-                elif self.current_table == self.offspring_table:
-                    dialog = OffspringDialog(self)
-                    if dialog.exec():
-                        new_offspring = Offspring(
-                            name=dialog.name.text(),
-                            mother_id=dialog.mother.currentData(),
-                            father_id=dialog.father.currentData(),
-                            date_of_birth=dialog.date_of_birth.date().toPython(),
-                            sex=dialog.sex.currentText()
-                        )
-                        session.add(new_offspring)
-                        session.commit()
-                        self.show_offspring()
-                elif self.current_table == self.caretaker_table:
-                    dialog = AnimalCaretakerDialog(self)
-                    if dialog.exec():
-                        new_caretaker = AnimalCaretaker(
-                            employee_id=dialog.employee.currentData(),
-                            animal_id=dialog.animal.currentData()
-                        )
-                        session.add(new_caretaker)
-                        session.commit()
-                        self.show_caretakers()
+                with profiler.action(f"Добавление: {section}"):
+                    REPOSITORIES[section].create(**dialog.values())
+                self.show_section(section)
             except Exception as e:
-                session.rollback()
                 QMessageBox.critical(self, "Ошибка", f"Ошибка при добавлении: {str(e)}")
 
     def edit_item_on_double_click(self, index):
         if not self.current_table:
             return
 
-        current_row = index.row()
-        if current_row < 0:
+        item_id = self.current_table.model().row_id(index.row())
+        if item_id is None:
             return
 
-        with get_session() as session:
-            try:
-                if self.current_table == self.animals_table:
-                    self.current_items = session.query(Animal).all()
-                    if current_row >= len(self.current_items):
-                        return
-                    item_id = self.current_items[current_row].id
-                    item = session.query(Animal).filter_by(id=item_id).first()
-                    if not item:
-                        return
-                    dialog = AnimalDialog(self, item)
-                    if dialog.exec():
-                        item.name = dialog.name.text()
-                        item.species_id = dialog.species.currentData()
-                        item.enclosure_id = dialog.enclosure.currentData()
-                        item.date_of_birth = dialog.date_of_birth.date().toPython()
-                        item.date_of_arrival = dialog.date_of_arrival.date().toPython()
-                        item.sex = dialog.sex.currentText()
-                        session.merge(item)
-                        session.commit()
-                        self.show_animals()
-                elif self.current_table == self.employees_table:
-                    self.current_items = session.query(Employee).all()
-                    if current_row >= len(self.current_items):
-                        return
-                    item_id = self.current_items[current_row].id
-                    item = session.query(Employee).filter_by(id=item_id).first()
-                    if not item:
-                        return
-                    dialog = EmployeeDialog(self, item)
-                    if dialog.exec():
-                        item.name = dialog.name.text()
-                        item.position_id = dialog.position.currentData()
-                        item.phone = dialog.phone.text()
-                        item.hire_date = dialog.hire_date.date().toPython()
-                        session.merge(item)
-                        session.commit()
-                        self.show_employees()
-                elif self.current_table == self.enclosures_table:
-                    self.current_items = session.query(Enclosure).all()
-                    if current_row >= len(self.current_items):
-                        return
-                    item_id = self.current_items[current_row].id
-                    item = session.query(Enclosure).filter_by(id=item_id).first()
-                    if not item:
-                        return
-                    dialog = EnclosureDialog(self, item)
-                    if dialog.exec():
-                        item.name = dialog.name.text()
-                        item.size = dialog.size.value()
-                        item.location = dialog.location.text()
-                        item.description = dialog.description.text()
-                        session.merge(item)
-                        session.commit()
-                        self.show_enclosures()
-                elif self.current_table == self.feeds_table:
-                    self.current_items = session.query(Feed).all()
-                    if current_row >= len(self.current_items):
-                        return
-                    item_id = self.current_items[current_row].id
-                    item = session.query(Feed).filter_by(id=item_id).first()
-                    if not item:
-                        return
-                    dialog = FeedDialog(self, item)
-                    if dialog.exec():
-                        item.name = dialog.name.text()
-                        item.description = dialog.description.text()
-                        session.merge(item)
-                        session.commit()
-                        self.show_feeds()
-                elif self.current_table == self.feeding_table:
-                    self.current_items = session.query(AnimalFeed).all()
-                    if current_row >= len(self.current_items):
-                        return
-                    item_id = self.current_items[current_row].id
-                    item = session.query(AnimalFeed).filter_by(id=item_id).first()
-                    if not item:
-                        return
-                    dialog = AnimalFeedDialog(self, item)
-                    if dialog.exec():
-                        item.animal_id = dialog.animal.currentData()
-                        item.feed_id = dialog.feed.currentData()
-                        item.daily_amount = dialog.daily_amount.value()
-                        session.merge(item)
-                        session.commit()
-                        self.show_feeding()
-                elif self.current_table == self.health_table:
-                    self.current_items = session.query(HealthRecord).all()
-                    if current_row >= len(self.current_items):
-                        return
-                    item_id = self.current_items[current_row].id
-                    item = session.query(HealthRecord).filter_by(id=item_id).first()
-                    if not item:
-                        return
-                    dialog = HealthRecordDialog(self, item)
-                    if dialog.exec():
-                        item.animal_id = dialog.animal.currentData()
-                        item.checkup_date = dialog.checkup_date.date().toPython()
-                        item.notes = dialog.notes.text()
-                        session.merge(item)
-                        session.commit()
-                        self.show_health()
-                elif self.current_table == self.offspring_table:
-                    self.current_items = session.query(Offspring).all()
-                    if current_row >= len(self.current_items):
-                        return
-                    item_id = self.current_items[current_row].id
-                    item = session.query(Offspring).filter_by(id=item_id).first()
-                    if not item:
-                        return
-                    dialog = OffspringDialog(self, item)
-                    if dialog.exec():
-                        item.name = dialog.name.text()
-                        item.mother_id = dialog.mother.currentData()
-                        item.father_id = dialog.father.currentData()
-                        item.date_of_birth = dialog.date_of_birth.date().toPython()
-                        item.sex = dialog.sex.currentText()
-                        session.merge(item)
-                        session.commit()
-                        self.show_offspring()
-                elif self.current_table == self.caretaker_table:
-                    self.current_items = session.query(AnimalCaretaker).all()
-                    if current_row >= len(self.current_items):
-                        return
-                    item_id = self.current_items[current_row].id
-                    item = session.query(AnimalCaretaker).filter_by(id=item_id).first()
-                    if not item:
-                        return
-                    dialog = AnimalCaretakerDialog(self, item)
-                    if dialog.exec():
-                        item.employee_id = dialog.employee.currentData()
-                        item.animal_id = dialog.animal.currentData()
-                        session.merge(item)
-                        session.commit()
-                        self.show_caretakers()
-            except Exception as e:
-                session.rollback()
-                QMessageBox.critical(self, "Ошибка", f"Ошибка при редактировании: {str(e)}")
+        section = self.current_table.model().section.name
+        try:
+            with profiler.action(f"Диалог: {section}"):
+                item = REPOSITORIES[section].get(item_id)
+                dialog = DIALOGS[section](self, item) if item else None
+            if dialog is None:
+                return
+            if dialog.exec():
+                with profiler.action(f"Изменение: {section}"):
+                    REPOSITORIES[section].update(item_id, **dialog.values())
+                self.show_section(section)
+        except Exception as e:
+            QMessageBox.critical(self, "Ошибка", f"Ошибка при редактировании: {str(e)}")
 
     def delete_item(self):
         if not self.current_table:
             QMessageBox.warning(self, "Ошибка", "Выберите таблицу для удаления")
             return
 
-        current_row = self.current_table.currentRow()
-        if current_row < 0:
+        item_id = self.current_table.model().row_id(self.current_table.currentIndex().row())
+        if item_id is None:
             QMessageBox.warning(self, "Ошибка", "Выберите строку для удаления")
             return
 
@@ -1385,266 +851,28 @@ class MainWindow(QMainWindow):
         if reply == QMessageBox.No:
             return
 
-        with get_session() as session:
-            try:
-                if self.current_table == self.animals_table:
-                    self.current_items = session.query(Animal).all()
-                    if current_row >= len(self.current_items):
-                        return
-                    item_id = self.current_items[current_row].id
-                    item = session.query(Animal).filter_by(id=item_id).first()
-                    if not item:
-                        return
-                    session.delete(item)
-                    session.commit()
-                    self.show_animals()
-                elif self.current_table == self.employees_table:
-                    self.current_items = session.query(Employee).all()
-                    if current_row >= len(self.current_items):
-                        return
-                    item_id = self.current_items[current_row].id
-                    item = session.query(Employee).filter_by(id=item_id).first()
-                    if not item:
-                        return
-                    session.delete(item)
-                    session.commit()
-                    self.show_employees()
-                elif self.current_table == self.enclosures_table:
-                    self.current_items = session.query(Enclosure).all()
-                    if current_row >= len(self.current_items):
-                        return
-                    item_id = self.current_items[current_row].id
-                    item = session.query(Enclosure).filter_by(id=item_id).first()
-                    if not item:
-                        return
-                    session.delete(item)
-                    session.commit()
-                    self.show_enclosures()
-                elif self.current_table == self.feeds_table:
-                    self.current_items = session.query(Feed).all()
-                    if current_row >= len(self.current_items):
-                        return
-                    item_id = self.current_items[current_row].id
-                    item = session.query(Feed).filter_by(id=item_id).first()
-                    if not item:
-                        return
-                    session.delete(item)
-                    session.commit()
-                    self.show_feeds()
-                elif self.current_table == self.feeding_table:
-                    self.current_items = session.query(AnimalFeed).all()
-                    if current_row >= len(self.current_items):
-                        return
-                    item_id = self.current_items[current_row].id
-                    item = session.query(AnimalFeed).filter_by(id=item_id).first()
-                    if not item:
-                        return
-                    session.delete(item)
-                    session.commit()
-                    self.show_feeding()
-                elif self.current_table == self.health_table:
-                    self.current_items = session.query(HealthRecord).all()
-                    if current_row >= len(self.current_items):
-                        return
-                    item_id = self.current_items[current_row].id
-                    item = session.query(HealthRecord).filter_by(id=item_id).first()
-                    if not item:
-                        return
-                    session.delete(item)
-                    session.commit()
-                    self.show_health()
-                elif self.current_table == self.offspring_table:
-                    self.current_items = session.query(Offspring).all()
-                    if current_row >= len(self.current_items):
-                        return
-                    item_id = self.current_items[current_row].id
-                    item = session.query(Offspring).filter_by(id=item_id).first()
-                    if not item:
-                        return
-                    session.delete(item)
-                    session.commit()
-                    self.show_offspring()
-                elif self.current_table == self.caretaker_table:
-                    self.current_items = session.query(AnimalCaretaker).all()
-                    if current_row >= len(self.current_items):
-                        return
-                    item_id = self.current_items[current_row].id
-                    item = session.query(AnimalCaretaker).filter_by(id=item_id).first()
-                    if not item:
-                        return
-                    session.delete(item)
-                    session.commit()
-                    self.show_caretakers()
-            except Exception as e:
-                session.rollback()
-                QMessageBox.critical(self, "Ошибка", f"Ошибка при удалении: {str(e)}")
-
-    def search_items(self, text):
-        if not text:
-            if self.current_table == self.animals_table:
-                self.show_animals()
-            elif self.current_table == self.employees_table:
-                self.show_employees()
-            elif self.current_table == self.enclosures_table:
-                self.show_enclosures()
-            elif self.current_table == self.feeds_table:
-                self.show_feeds()
-            elif self.current_table == self.feeding_table:
-                self.show_feeding()
-            elif self.current_table == self.health_table:
-                self.show_health()
-            elif self.current_table == self.offspring_table:
-                self.show_offspring()
-            elif self.current_table == self.caretaker_table:
-                self.show_caretakers()
-            return
-        with get_session() as session:
+        section = self.current_table.model().section.name
+        try:
+            with profiler.action(f"Удаление: {section}"):
+                deleted = REPOSITORIES[section].delete(item_id)
+            if deleted:
+                self.show_section(section)
+        except Exception as e:
+            QMessageBox.critical(self, "Ошибка", f"Ошибка при удалении: {str(e)}")
+
+    def search_items(self):
+        with profiler.action(f"Поиск: {self.search_input.text()}"):
+            text = self.search_input.text()
+            if not self.current_table:
+                return
+            if not text:
+                self.load_data(self.current_table.model().section.name, self.current_table)
+                return
+            model = self.current_table.model()
+            if model.section is None or model.section.search_condition is None:
+                return
             text = text.lower()
-            if self.current_table == self.animals_table:
-                filtered_items = session.query(Animal).filter(
-                    (Animal.name.ilike(f"%{text}%")) |
-                    (Animal.fk_species.has(Species.name.ilike(f"%{text}%"))) |
-                    (Animal.fk_enclosure.has(Enclosure.name.ilike(f"%{text}%")))
-                ).all()
-                headers = ["Имя", "Вид", "Вольер", "Дата рождения", "Дата прибытия", "Пол"]
-                def get_animal_data(animal):
-                    return [
-                        animal.name,
-                        animal.fk_species.name if animal.fk_species else "",
-                        animal.fk_enclosure.name if animal.fk_enclosure else "",
-                        animal.date_of_birth,
-                        animal.date_of_arrival,
-                        animal.sex
-                    ]
-                self.current_items = filtered_items
-                self.animals_table.setRowCount(len(filtered_items))
-                self.animals_table.setColumnCount(len(headers))
-                self.animals_table.setHorizontalHeaderLabels(headers)
-                for row, item in enumerate(filtered_items):
-                    for col, value in enumerate(get_animal_data(item)):
-                        self.animals_table.setItem(row, col, QTableWidgetItem(str(value)))
-                self.animals_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-
-            elif self.current_table == self.employees_table:
-                filtered_items = session.query(Employee).filter(
-                    (Employee.name.ilike(f"%{text}%")) |
-                    (Employee.fk_position.has(Position.name.ilike(f"%{text}%"))) |
-                    (Employee.phone.ilike(f"%{text}%"))
-                ).all()
-                headers = ["ФИО", "Должность", "Телефон", "Дата найма"]
-                def get_employee_data(employee):
-                    return [
-                        employee.name,
-                        employee.fk_position.name if employee.fk_position else "",
-                        employee.phone,
-                        employee.hire_date
-                    ]
-                self.current_items = filtered_items
-                self.employees_table.setRowCount(len(filtered_items))
-                self.employees_table.setColumnCount(len(headers))
-                self.employees_table.setHorizontalHeaderLabels(headers)
-                for row, item in enumerate(filtered_items):
-                    for col, value in enumerate(get_employee_data(item)):
-                        self.employees_table.setItem(row, col, QTableWidgetItem(str(value)))
-                self.employees_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-
-            elif self.current_table == self.enclosures_table:
-                filtered_items = session.query(Enclosure).filter(
-                    (Enclosure.name.ilike(f"%{text}%")) |
-                    (Enclosure.location.ilike(f"%{text}%")) |
-                    (Enclosure.description.ilike(f"%{text}%"))
-                ).all()
-                headers = ["Название", "Размер (m²)", "Местоположение", "Описание"]
-                def get_enclosure_data(enclosure):
-                    return [enclosure.name, enclosure.size, enclosure.location, enclosure.description]
-                self.current_items = filtered_items
-                self.enclosures_table.setRowCount(len(filtered_items))
-                self.enclosures_table.setColumnCount(len(headers))
-                self.enclosures_table.setHorizontalHeaderLabels(headers)
-                for row, item in enumerate(filtered_items):
-                    for col, value in enumerate(get_enclosure_data(item)):
-                        self.enclosures_table.setItem(row, col, QTableWidgetItem(str(value)))
-                self.enclosures_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-
-            elif self.current_table == self.feeds_table:
-                filtered_items = session.query(Feed).filter(
-                    (Feed.name.ilike(f"%{text}%")) |
-                    (Feed.description.ilike(f"%{text}%"))
-                ).all()
-                headers = ["Название", "Описание"]
-                def get_feed_data(feed):
-                    return [feed.name, feed.description]
-                self.current_items = filtered_items
-                self.feeds_table.setRowCount(len(filtered_items))
-                self.feeds_table.setColumnCount(len(headers))
-                self.feeds_table.setHorizontalHeaderLabels(headers)
-                for row, item in enumerate(filtered_items):
-                    for col, value in enumerate(get_feed_data(item)):
-                        self.feeds_table.setItem(row, col, QTableWidgetItem(str(value)))
-                self.feeds_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-
-            elif self.current_table == self.feeding_table:
-                filtered_items = session.query(AnimalFeed).filter(
-                    (AnimalFeed.fk_animal.has(Animal.name.ilike(f"%{text}%"))) |
-                    (AnimalFeed.fk_feed.has(Feed.name.ilike(f"%{text}%")))
-                ).all()
-                headers = ["Животное", "Корм", "Суточная норма (кг)"]
-                def get_feeding_data(animal_feed):
-                    return [
-                        animal_feed.fk_animal.name if animal_feed.fk_animal else "",
-                        animal_feed.fk_feed.name if animal_feed.fk_feed else "",
-                        animal_feed.daily_amount
-                    ]
-                self.current_items = filtered_items
-                self.feeding_table.setRowCount(len(filtered_items))
-                self.feeding_table.setColumnCount(len(headers))
-                self.feeding_table.setHorizontalHeaderLabels(headers)
-                for row, item in enumerate(filtered_items):
-                    for col, value in enumerate(get_feeding_data(item)):
-                        self.feeding_table.setItem(row, col, QTableWidgetItem(str(value)))
-                self.feeding_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-
-            elif self.current_table == self.health_table:
-                filtered_items = session.query(HealthRecord).filter(
-                    (HealthRecord.fk_animal.has(Animal.name.ilike(f"%{text}%"))) |
-                    (HealthRecord.notes.ilike(f"%{text}%"))
-                ).all()
-                headers = ["Животное", "Дата осмотра", "Заметки"]
-                def get_health_data(health_record):
-                    return [
-                        health_record.fk_animal.name if health_record.fk_animal else "",
-                        health_record.checkup_date,
-                        health_record.notes
-                    ]
-                self.current_items = filtered_items
-                self.health_table.setRowCount(len(filtered_items))
-                self.health_table.setColumnCount(len(headers))
-                self.health_table.setHorizontalHeaderLabels(headers)
-                for row, item in enumerate(filtered_items):
-                    for col, value in enumerate(get_health_data(item)):
-                        self.health_table.setItem(row, col, QTableWidgetItem(str(value)))
-                self.health_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-
-            elif self.current_table == self.offspring_table:
-                filtered_items = session.query(Offspring).filter(
-                    (Offspring.name.ilike(f"%{text}%")) |
-                    (Offspring.fk_mother.has(Animal.name.ilike(f"%{text}%"))) |
-                    (Offspring.fk_father.has(Animal.name.ilike(f"%{text}%")))
-                ).all()
-                headers = ["Имя", "Мать", "Отец", "Дата рождения", "Пол"]
-                def get_offspring_data(offspring):
-                    return [
-                        offspring.name,
-                        offspring.fk_mother.name if offspring.fk_mother else "Неизвестно",
-                        offspring.fk_father.name if offspring.fk_father else "Неизвестно",
-                        offspring.date_of_birth,
-                        offspring.sex
-                    ]
-                self.current_items = filtered_items
-                self.offspring_table.setRowCount(len(filtered_items))
-                self.offspring_table.setColumnCount(len(headers))
-                self.offspring_table.setHorizontalHeaderLabels(headers)
-                for row, item in enumerate(filtered_items):
-                    for col, value in enumerate(get_offspring_data(item)):
-                        self.offspring_table.setItem(row, col, QTableWidgetItem(str(value)))
-                self.offspring_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
\ No newline at end of file
+            if model.can_refine(text):
+                model.refine(text)
+            else:
+                model.set_source(model.section, text)
@@ -0,0 +1,64 @@
+from sqlalchemy import select, func, or_, literal
+from sqlalchemy.orm import aliased
+from db import Animal, Offspring
+
+
+def offspring_record_id(animal):
+    # Запись о рождении животного ищется по имени; при нескольких совпадениях
+    # берётся первая, как и раньше в build_pedigree
+    record = aliased(Offspring)
+    return select(func.min(record.id)).where(record.name == animal.name).scalar_subquery()
+
+
+def ancestors_query(animal_id):
+    # Все предки животного одним запросом WITH RECURSIVE. UNION (а не UNION ALL)
+    # оставляет каждого предка один раз, поэтому общие предки и циклы не
+    # размножают строки, а глубина дерева не влияет на число запросов
+    child = aliased(Animal)
+    parent = aliased(Animal)
+    ancestors = select(literal(animal_id).label("id")).cte("ancestors", recursive=True)
+    ancestors = ancestors.union(
+        select(parent.id)
+        .select_from(ancestors)
+        .join(child, child.id == ancestors.c.id)
+        .join(Offspring, Offspring.id == offspring_record_id(child))
+        .join(parent, or_(parent.id == Offspring.mother_id, parent.id == Offspring.father_id))
+    )
+    record = aliased(Offspring)
+    return (
+        select(Animal.id, Animal.name, Animal.sex, Animal.date_of_birth, record.mother_id, record.father_id)
+        .join(ancestors, ancestors.c.id == Animal.id)
+        .outerjoin(record, record.id == offspring_record_id(Animal))
+    )
+
+
+# Родословная животного: предки загружаются один раз, дальше дерево строится в памяти
+class Pedigree:
+    def __init__(self, rows):
+        self.animals = {row.id: row for row in rows}
+        self.rendered = {}
+
+    @classmethod
+    def load(cls, session, animal_id):
+        return cls(session.execute(ancestors_query(animal_id)).all())
+
+    def render(self, animal_id, depth=0, max_depth=5):
+        if depth > max_depth:
+            return "  " * depth + "... (дальше не отображается)\n"
+        # Общий предок встречается в дереве несколько раз - его поддерево строится однажды
+        key = (animal_id, depth)
+        if key in self.rendered:
+            return self.rendered[key]
+
+        animal = self.animals[animal_id]
+        indent = "  " * depth
+        result = f"{indent}{animal.name} ({animal.sex}, {animal.date_of_birth})\n"
+        if animal.mother_id in self.animals:
+            result += f"{indent}Мать:\n"
+            result += self.render(animal.mother_id, depth + 1, max_depth)
+        if animal.father_id in self.animals:
+            result += f"{indent}Отец:\n"
+            result += self.render(animal.father_id, depth + 1, max_depth)
+
+        self.rendered[key] = result
+        return result
@@ -0,0 +1,149 @@
+import json
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from db import load_config
+
+# Сколько одинаковых запросов за одно действие считать признаком N+1
+N_PLUS_ONE_THRESHOLD = 5
+HISTORY_SIZE = 200
+
+_local = threading.local()
+_lock = threading.Lock()
+history = deque(maxlen=HISTORY_SIZE)
+log_path = load_config()["profile_log"] or None
+
+
+# Действие пользователя (переключение раздела, поиск, обновление, диалог, отчёт)
+# и запросы, выполненные ради него, в том числе в фоновых потоках
+class Action:
+    def __init__(self, name):
+        self.name = name
+        self.started = time.time()
+        self.finished = None
+        self.statements = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.counts = Counter()
+        self.pending = 0
+        self.open = True
+
+    def suspects(self):
+        return [(statement, count) for statement, count in self.counts.most_common()
+                if count >= N_PLUS_ONE_THRESHOLD]
+
+    def as_dict(self):
+        return {
+            "action": self.name,
+            "started": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started)),
+            "duration_ms": round(((self.finished or time.time()) - self.started) * 1000, 1),
+            "statements": self.statements,
+            "db_time_ms": round(self.db_time * 1000, 1),
+            "rows": self.rows,
+            "n_plus_one": [{"statement": " ".join(statement.split())[:200], "count": count}
+                           for statement, count in self.suspects()],
+        }
+
+
+def current_action():
+    return getattr(_local, "action", None)
+
+
+@contextmanager
+def action(name):
+    # Вложенное действие (подгрузка страницы при переключении раздела) не создаёт
+    # новую запись, а учитывается во внешнем
+    outer = current_action()
+    if outer is not None:
+        yield outer
+        return
+    item = Action(name)
+    with _lock:
+        history.append(item)
+    _local.action = item
+    try:
+        yield item
+    finally:
+        _local.action = None
+        with _lock:
+            item.open = False
+            complete = item.pending == 0
+        if complete:
+            finish(item)
+
+
+# Фоновые задачи (DbTask) продолжают действие, в котором были созданы:
+# действие завершается, когда закончилась последняя из них
+def task_created(item):
+    if item is not None:
+        with _lock:
+            item.pending += 1
+
+
+def task_finished(item):
+    if item is None:
+        return
+    with _lock:
+        item.pending -= 1
+        complete = not item.open and item.pending == 0
+    if complete:
+        finish(item)
+
+
+@contextmanager
+def activate(item):
+    previous = current_action()
+    _local.action = item
+    try:
+        yield
+    finally:
+        _local.action = previous
+
+
+def finish(item):
+    item.finished = time.time()
+    with _lock:
+        if not item.statements:
+            # Действия без запросов (например, обновление без изменений) только засоряют историю
+            if item in history:
+                history.remove(item)
+            return
+        if log_path:
+            with open(log_path, "a", encoding="utf-8") as log:
+                log.write(json.dumps(item.as_dict(), ensure_ascii=False) + "\n")
+
+
+def snapshot():
+    with _lock:
+        return [item.as_dict() for item in reversed(history)]
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def statement_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("profiler_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def statement_finished(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["profiler_started"].pop()
+    item = current_action()
+    if item is None:
+        return
+    with _lock:
+        item.statements += 1
+        item.db_time += elapsed
+        item.counts[statement] += 1
+        # Число строк известно драйверу только для обычного (не серверного) курсора
+        if cursor.rowcount > 0 and statement.lstrip()[:6].upper() == "SELECT":
+            item.rows += cursor.rowcount
+
+
+@event.listens_for(Engine, "handle_error")
+def statement_failed(context):
+    if context.connection is not None:
+        started = context.connection.info.get("profiler_started")
+        if started:
+            started.pop()
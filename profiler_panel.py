@@ -0,0 +1,49 @@
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QHeaderView
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QColor
+import profiler
+
+HEADERS = ["Время", "Действие", "Запросов", "Время БД, мс", "Строк", "Длительность, мс", "Повторяющиеся запросы"]
+
+
+# Отладочная панель (F12): запросы к базе по последним действиям пользователя.
+# Действия с подозрением на N+1 (один и тот же запрос много раз) подсвечены
+class ProfilerPanel(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent, Qt.Tool)
+        self.setWindowTitle("Запросы к базе")
+        self.resize(900, 400)
+        layout = QVBoxLayout(self)
+        log_text = f"Журнал: {profiler.log_path}" if profiler.log_path else "Журнал не пишется (profile_log в zoo.ini)"
+        layout.addWidget(QLabel(log_text))
+        self.table = QTableWidget(0, len(HEADERS))
+        self.table.setHorizontalHeaderLabels(HEADERS)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.table)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        self.refresh()
+        self.timer.start(1000)
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        actions = profiler.snapshot()
+        self.table.setRowCount(len(actions))
+        for row, item in enumerate(actions):
+            suspects = "; ".join(f"{suspect['count']}× {suspect['statement'][:80]}" for suspect in item["n_plus_one"])
+            values = [item["started"], item["action"], item["statements"], item["db_time_ms"],
+                      item["rows"], item["duration_ms"], suspects]
+            for column, value in enumerate(values):
+                cell = QTableWidgetItem(str(value))
+                if suspects:
+                    cell.setBackground(QColor("#FFE0E0"))
+                self.table.setItem(row, column, cell)
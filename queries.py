@@ -0,0 +1,266 @@
+from sqlalchemy import func, select, union, union_all, tuple_, literal, literal_column
+from sqlalchemy.orm import joinedload
+from db import get_session, name_key, Base, Animal, Species, Enclosure, Employee, HealthRecord, AnimalFeed, Feed, Offspring, AnimalCaretaker, Position
+
+PAGE_SIZE = 200
+PICKER_PAGE_SIZE = 50
+
+
+# Раздел главного окна: модель, заголовки таблицы, связи для жадной загрузки и функция строки
+class Section:
+    def __init__(self, name, model, headers, row_function, relations=(), search_condition=None, search_columns=()):
+        self.name = name
+        self.model = model
+        self.headers = headers
+        self.row_function = row_function
+        self.relations = relations
+        self.search_condition = search_condition
+        # Столбцы таблицы, по которым ищет search_condition (для уточнения поиска в памяти)
+        self.search_columns = search_columns
+
+    def query(self, session):
+        # Связанные записи подтягиваются одним запросом с LEFT OUTER JOIN,
+        # а не отдельным SELECT на каждую строку (N+1)
+        query = session.query(self.model)
+        for relation in self.relations:
+            query = query.options(joinedload(relation))
+        return query.order_by(self.model.id)
+
+    def search_query(self, session, text):
+        # % и _ в тексте поиска ищутся как обычные символы, так же как в matches()
+        return self.query(session).filter(self.search_condition(f"%{escape_like(text)}%"))
+
+    def filtered_query(self, session, text=None):
+        return self.search_query(session, text) if text else self.query(session)
+
+    def fetch_page(self, after_id, limit=PAGE_SIZE, text=None):
+        # Постраничная выборка по ключу: следующая страница начинается после
+        # последнего загруженного id, поэтому OFFSET не нужен
+        with get_session() as session:
+            items = self.filtered_query(session, text).filter(self.model.id > after_id).limit(limit).all()
+            return [(item.id, self.row_function(item)) for item in items]
+
+    def fetch_rows(self, text=None, ids=None, max_id=None):
+        # Повторная выборка только изменившихся строк или уже загруженного диапазона
+        with get_session() as session:
+            query = self.filtered_query(session, text)
+            if ids is not None:
+                query = query.filter(self.model.id.in_(ids))
+            if max_id is not None:
+                query = query.filter(self.model.id <= max_id)
+            return [(item.id, self.row_function(item)) for item in query]
+
+    def stream_rows(self, text=None, batch_size=1000):
+        # Все строки раздела для выгрузки. Объекты читаются пачками через серверный
+        # курсор (yield_per), поэтому в памяти не держится вся таблица
+        with get_session() as session:
+            for item in self.filtered_query(session, text).yield_per(batch_size):
+                yield self.row_function(item)
+
+    def watermark(self):
+        # Признак изменений для проверки без уведомлений: по таблице раздела и каждой
+        # связанной - число строк, max(id) и max(xmin). xmin строки меняется при UPDATE,
+        # поэтому заметны и правки, и переименования в связанных таблицах.
+        # Вне PostgreSQL xmin нет, признак None - загруженные строки перечитываются всегда
+        with get_session() as session:
+            if session.get_bind().dialect.name != "postgresql":
+                return None
+            tables = [self.model.__table__] + [Base.metadata.tables[name] for name in sorted(self.related_tables())]
+            query = union_all(*[select(literal(table.name), func.count(), func.max(table.c.id),
+                                       func.max(literal_column("xmin::text::bigint"))).select_from(table)
+                                for table in tables])
+            return tuple(sorted(tuple(row) for row in session.execute(query)))
+
+    def matches(self, values, text):
+        # Заглушки на месте отсутствующей связи в базе - NULL, поиск их не находит
+        return any(values[column] is not None and not isinstance(values[column], Placeholder)
+                   and text in str(values[column]).lower()
+                   for column in self.search_columns)
+
+    def table_name(self):
+        return self.model.__tablename__
+
+    def related_tables(self):
+        return {relation.property.mapper.local_table.name for relation in self.relations}
+
+
+def any_match(model, *conditions):
+    # Каждое условие - отдельная ветка UNION: так PostgreSQL использует для неё
+    # свой индекс (триграммный по названию, индекс внешнего ключа), а не
+    # последовательно просматривает таблицу, проверяя OR по всем строкам
+    return model.id.in_(union(*(select(model.id).where(condition) for condition in conditions)))
+
+
+def name_matches(foreign_key, target, pattern):
+    return foreign_key.in_(select(target.id).where(ilike(target.name, pattern)))
+
+
+def ilike(column, pattern):
+    return column.ilike(pattern, escape="\\")
+
+
+def escape_like(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_animals(prefix, sex=None, after=None, limit=PICKER_PAGE_SIZE):
+    # Страница животных, имя которых начинается с prefix (без учёта регистра),
+    # в порядке name_key (побайтово). after - ключ (lower(name), id) последней загруженной строки
+    key = name_key(Animal.name)
+    query = select(Animal.id, Animal.name, key).where(key.like(escape_like(prefix.lower()) + "%", escape="\\"))
+    if sex is not None:
+        query = query.where(Animal.sex == sex)
+    if after is not None:
+        query = query.where(tuple_(key, Animal.id) > tuple_(*after))
+    with get_session() as session:
+        return session.execute(query.order_by(key, Animal.id).limit(limit)).all()
+
+
+def find_animals(name, sex=None, limit=2):
+    # id животных с точно таким именем (без учёта регистра); по индексу ix_animal_name_prefix
+    query = select(Animal.id).where(name_key(Animal.name) == name.lower())
+    if sex is not None:
+        query = query.where(Animal.sex == sex)
+    with get_session() as session:
+        return session.execute(query.order_by(Animal.id).limit(limit)).scalars().all()
+
+
+def animal_name(animal_id):
+    with get_session() as session:
+        return session.execute(select(Animal.name).where(Animal.id == animal_id)).scalar()
+
+
+# Текст на месте отсутствующей связанной записи: показывается в таблице,
+# но не участвует в уточнении поиска (Section.matches)
+class Placeholder(str):
+    pass
+
+
+UNKNOWN = Placeholder("Неизвестно")
+
+
+def get_animal_data(animal):
+    return [
+        animal.name,
+        animal.fk_species.name if animal.fk_species else "",
+        animal.fk_enclosure.name if animal.fk_enclosure else "",
+        animal.date_of_birth,
+        animal.date_of_arrival,
+        animal.sex
+    ]
+
+
+def get_employee_data(employee):
+    return [
+        employee.name,
+        employee.fk_position.name if employee.fk_position else "",
+        employee.phone,
+        employee.hire_date
+    ]
+
+
+def get_enclosure_data(enclosure):
+    return [enclosure.name, enclosure.size, enclosure.location, enclosure.description]
+
+
+def get_feed_data(feed):
+    return [feed.name, feed.description]
+
+
+def get_feeding_data(animal_feed):
+    return [
+        animal_feed.fk_animal.name if animal_feed.fk_animal else "",
+        animal_feed.fk_feed.name if animal_feed.fk_feed else "",
+        animal_feed.daily_amount
+    ]
+
+
+def get_health_data(health_record):
+    return [
+        health_record.fk_animal.name if health_record.fk_animal else "",
+        health_record.checkup_date,
+        health_record.notes
+    ]
+
+
+def get_offspring_data(offspring):
+    return [
+        offspring.name,
+        offspring.fk_mother.name if offspring.fk_mother else UNKNOWN,
+        offspring.fk_father.name if offspring.fk_father else UNKNOWN,
+        offspring.date_of_birth,
+        offspring.sex
+    ]
+
+
+def get_caretaker_data(caretaker):
+    return [
+        caretaker.fk_employee.name if caretaker.fk_employee else "",
+        caretaker.fk_animal.name if caretaker.fk_animal else ""
+    ]
+
+
+SECTIONS = {
+    "Животные": Section(
+        "Животные", Animal,
+        ["Имя", "Вид", "Вольер", "Дата рождения", "Дата прибытия", "Пол"],
+        get_animal_data, (Animal.fk_species, Animal.fk_enclosure),
+        lambda pattern: any_match(Animal,
+                                  ilike(Animal.name, pattern),
+                                  name_matches(Animal.species_id, Species, pattern),
+                                  name_matches(Animal.enclosure_id, Enclosure, pattern)),
+        (0, 1, 2)),
+    "Сотрудники": Section(
+        "Сотрудники", Employee,
+        ["ФИО", "Должность", "Телефон", "Дата найма"],
+        get_employee_data, (Employee.fk_position,),
+        lambda pattern: any_match(Employee,
+                                  ilike(Employee.name, pattern),
+                                  name_matches(Employee.position_id, Position, pattern),
+                                  ilike(Employee.phone, pattern)),
+        (0, 1, 2)),
+    "Вольеры": Section(
+        "Вольеры", Enclosure,
+        ["Название", "Размер (m²)", "Местоположение", "Описание"],
+        get_enclosure_data, (),
+        lambda pattern: (ilike(Enclosure.name, pattern) |
+                         ilike(Enclosure.location, pattern) |
+                         ilike(Enclosure.description, pattern)),
+        (0, 2, 3)),
+    "Корма": Section(
+        "Корма", Feed,
+        ["Название", "Описание"],
+        get_feed_data, (),
+        lambda pattern: (ilike(Feed.name, pattern) |
+                         ilike(Feed.description, pattern)),
+        (0, 1)),
+    "Кормление": Section(
+        "Кормление", AnimalFeed,
+        ["Животное", "Корм", "Суточная норма (кг)"],
+        get_feeding_data, (AnimalFeed.fk_animal, AnimalFeed.fk_feed),
+        lambda pattern: any_match(AnimalFeed,
+                                  name_matches(AnimalFeed.animal_id, Animal, pattern),
+                                  name_matches(AnimalFeed.feed_id, Feed, pattern)),
+        (0, 1)),
+    "Медицина": Section(
+        "Медицина", HealthRecord,
+        ["Животное", "Дата осмотра", "Заметки"],
+        get_health_data, (HealthRecord.fk_animal,),
+        lambda pattern: any_match(HealthRecord,
+                                  name_matches(HealthRecord.animal_id, Animal, pattern),
+                                  ilike(HealthRecord.notes, pattern)),
+        (0, 2)),
+    "Потомство": Section(
+        "Потомство", Offspring,
+        ["Имя", "Мать", "Отец", "Дата рождения", "Пол"],
+        get_offspring_data, (Offspring.fk_mother, Offspring.fk_father),
+        lambda pattern: any_match(Offspring,
+                                  ilike(Offspring.name, pattern),
+                                  name_matches(Offspring.mother_id, Animal, pattern),
+                                  name_matches(Offspring.father_id, Animal, pattern)),
+        (0, 1, 2)),
+    "Ухаживающие": Section(
+        "Ухаживающие", AnimalCaretaker,
+        ["Сотрудник", "Животное"],
+        get_caretaker_data, (AnimalCaretaker.fk_employee, AnimalCaretaker.fk_animal)),
+}
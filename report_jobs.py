@@ -0,0 +1,68 @@
+from PySide6.QtCore import QObject, QThreadPool, Signal
+from db_worker import DbTask, TaskSignals
+from reports import write_report, ReportCancelled
+
+
+class ReportSignals(TaskSignals):
+    progress = Signal(int)
+
+
+# Построение одного отчёта в файл. Отмена срабатывает на ближайшей пачке строк,
+# а выполняющийся запрос прерывается на сервере (см. DbTask.cancel)
+class ReportJob(DbTask):
+    def __init__(self, report_type, path, animal_name=None):
+        super().__init__(write_report, (report_type, path, animal_name, self.report_progress))
+        self.signals = ReportSignals()
+        self.report_type = report_type
+        self.path = path
+
+    def report_progress(self, done, total):
+        if self.cancelled:
+            raise ReportCancelled()
+        self.signals.progress.emit(int(done * 100 / total) if total else 0)
+
+
+# Очередь отчётов: отчёты строятся по одному в отдельном потоке, пока пользователь
+# продолжает работать с таблицами
+class ReportQueue(QObject):
+    started = Signal(str)
+    progress = Signal(int)
+    finished = Signal(str, str)
+    failed = Signal(str, object)
+    queue_changed = Signal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.jobs = []
+
+    def enqueue(self, report_type, path, animal_name=None):
+        job = ReportJob(report_type, path, animal_name)
+        job.setAutoDelete(False)
+        job.signals.progress.connect(self.report_progress)
+        job.signals.finished.connect(lambda path: self.finished.emit(report_type, path))
+        job.signals.failed.connect(lambda error: self.failed.emit(report_type, error))
+        job.signals.done.connect(lambda: self.job_done(job))
+        self.jobs.append(job)
+        self.pool.start(job)
+        if len(self.jobs) == 1:
+            self.started.emit(report_type)
+        self.queue_changed.emit(len(self.jobs))
+        return job
+
+    def report_progress(self, percent):
+        self.progress.emit(percent)
+
+    def cancel_current(self):
+        if self.jobs:
+            self.jobs[0].cancel()
+
+    def job_done(self, job):
+        self.jobs.remove(job)
+        if self.jobs:
+            self.started.emit(self.jobs[0].report_type)
+        self.queue_changed.emit(len(self.jobs))
+
+    def wait(self, msecs=-1):
+        return self.pool.waitForDone(msecs)
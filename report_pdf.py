@@ -0,0 +1,44 @@
+from fpdf import FPDF
+
+ROW_HEIGHT = 7
+
+
+# PDF с таблицей, заголовок которой повторяется на каждой новой странице
+class ReportPDF(FPDF):
+    def __init__(self):
+        super().__init__()
+        self.columns = None
+
+    def header(self):
+        if self.columns:
+            self.table_header()
+
+    def table_header(self):
+        self.set_font('FreeSans', '', 10)
+        self.set_fill_color(199, 232, 255)
+        for column in self.columns:
+            self.cell(column.width, ROW_HEIGHT, column.header, border=1, align='C', fill=True)
+        self.ln()
+
+    def start_table(self, columns):
+        self.columns = columns
+        self.table_header()
+
+    def end_table(self):
+        self.columns = None
+
+    def table_row(self, values):
+        for column, value in zip(self.columns, values):
+            text = self.fit(column.format(value), column.width - 2)
+            self.cell(column.width, ROW_HEIGHT, text, border=1, align=column.align)
+        self.ln()
+
+    def fit(self, text, width):
+        # Длинный текст обрезается по ширине столбца, чтобы строка таблицы оставалась одной строкой
+        text_width = self.get_string_width(text)
+        if text_width <= width:
+            return text
+        text = text[:int(len(text) * width / text_width)]
+        while text and self.get_string_width(text + "…") > width:
+            text = text[:-1]
+        return text + "…"
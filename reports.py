@@ -0,0 +1,254 @@
+from sqlalchemy import select, func, extract, cast, Integer
+from db import get_session, Animal, Species, Enclosure, Employee, Position, HealthRecord, AnimalFeed, Feed, AnimalCaretaker
+from pedigree import Pedigree
+
+BATCH_SIZE = 1000
+
+
+# Ошибка в исходных данных отчёта, которую нужно показать пользователю как предупреждение
+class ReportError(Exception):
+    pass
+
+
+# Построение отчёта прервано пользователем
+class ReportCancelled(Exception):
+    pass
+
+
+# Типы отчётов в порядке, в котором они предлагаются пользователю
+REPORT_TYPES = [
+    "Отчёт по животным",
+    "Отчёт по сотрудникам",
+    "Отчёт по вольерам",
+    "Отчёт по кормам",
+    "Отчёт по кормлению",
+    "Отчёт по медицинским записям",
+    "Отчёт по родословной",
+    "Отчёт по ухаживающим",
+]
+
+
+def report_filename(report_type):
+    return report_type.lower().replace(" ", "_").replace("отчёт_", "") + "_report.pdf"
+
+
+def or_default(default):
+    return lambda value: str(value) if value else default
+
+
+# Столбец табличного отчёта: заголовок, ширина в мм, выравнивание и форматирование значения
+class ReportColumn:
+    def __init__(self, header, width, align="L", format=str):
+        self.header = header
+        self.width = width
+        self.align = align
+        self.format = format
+
+
+# Сводная таблица в конце отчёта. Запрос группирует строки в базе (GROUP BY),
+# в PDF попадают только готовые итоги
+class ReportSummary:
+    def __init__(self, title, columns, query):
+        self.title = title
+        self.columns = columns
+        self.query = query
+
+    def write(self, pdf, session):
+        pdf.ln(5)
+        pdf.set_font('FreeSans', '', 12)
+        pdf.cell(0, 10, self.title, ln=True)
+        pdf.start_table(self.columns)
+        for row in session.execute(self.query()):
+            pdf.table_row(row)
+        pdf.end_table()
+
+
+# Табличный отчёт. Запрос возвращает кортежи значений (без ORM-объектов), строки
+# читаются из базы пачками и сразу пишутся в PDF. Итоги и сводные таблицы
+# считаются агрегатными запросами
+class TableReport:
+    def __init__(self, columns, query, total_label, total_column=None, summaries=()):
+        self.columns = columns
+        self.query = query
+        self.total_label = total_label
+        self.total_column = total_column
+        self.summaries = summaries
+
+    def totals(self, session):
+        # Количество строк и сумма по столбцу total_column одним запросом
+        rows = self.query().subquery()
+        columns = [func.count()]
+        if self.total_column is not None:
+            columns.append(func.sum(list(rows.c)[self.total_column]))
+        result = session.execute(select(*columns).select_from(rows)).one()
+        return result[0], (result[1] if self.total_column is not None else None) or 0.0
+
+    def write(self, pdf, session, progress=None):
+        count, total = self.totals(session)
+        if progress is not None:
+            progress(0, count)
+        pdf.start_table(self.columns)
+        written = 0
+        for row in session.execute(self.query().execution_options(yield_per=BATCH_SIZE)):
+            pdf.table_row(row)
+            written += 1
+            if progress is not None and written % BATCH_SIZE == 0:
+                progress(written, count)
+        pdf.end_table()
+
+        pdf.ln(5)
+        pdf.set_font('FreeSans', '', 14)
+        pdf.cell(0, 10, self.total_label.format(count=count, total=total), ln=True, align='R')
+
+        for summary in self.summaries:
+            summary.write(pdf, session)
+
+
+REPORTS = {
+    "Отчёт по животным": TableReport(
+        [ReportColumn("Имя", 35), ReportColumn("Вид", 35, format=or_default("Не указан")),
+         ReportColumn("Вольер", 35, format=or_default("Не указан")), ReportColumn("Дата рождения", 30, "C"),
+         ReportColumn("Дата прибытия", 30, "C"), ReportColumn("Пол", 25, "C")],
+        lambda: select(Animal.name, Species.name, Enclosure.name, Animal.date_of_birth,
+                       Animal.date_of_arrival, Animal.sex)
+        .outerjoin(Species, Animal.species_id == Species.id)
+        .outerjoin(Enclosure, Animal.enclosure_id == Enclosure.id)
+        .order_by(Animal.id),
+        "Общее количество животных: {count}",
+        summaries=[
+            ReportSummary(
+                "Животные по видам",
+                [ReportColumn("Вид", 140, format=or_default("Не указан")), ReportColumn("Количество", 50, "R")],
+                lambda: select(Species.name, func.count(Animal.id))
+                .outerjoin(Species, Animal.species_id == Species.id)
+                .group_by(Species.id, Species.name)
+                .order_by(func.count(Animal.id).desc(), Species.name)),
+            ReportSummary(
+                "Животные по вольерам",
+                [ReportColumn("Вольер", 140, format=or_default("Не указан")), ReportColumn("Количество", 50, "R")],
+                lambda: select(Enclosure.name, func.count(Animal.id))
+                .outerjoin(Enclosure, Animal.enclosure_id == Enclosure.id)
+                .group_by(Enclosure.id, Enclosure.name)
+                .order_by(func.count(Animal.id).desc(), Enclosure.name)),
+        ]),
+    "Отчёт по сотрудникам": TableReport(
+        [ReportColumn("ФИО", 70), ReportColumn("Должность", 50, format=or_default("Не указана")),
+         ReportColumn("Телефон", 40), ReportColumn("Дата найма", 30, "C")],
+        lambda: select(Employee.name, Position.name, Employee.phone, Employee.hire_date)
+        .outerjoin(Position, Employee.position_id == Position.id)
+        .order_by(Employee.id),
+        "Общее количество сотрудников: {count}"),
+    "Отчёт по вольерам": TableReport(
+        [ReportColumn("Название", 45), ReportColumn("Размер", 25, "R", lambda size: f"{size} м²"),
+         ReportColumn("Местоположение", 45), ReportColumn("Описание", 75, format=or_default("Нет описания"))],
+        lambda: select(Enclosure.name, Enclosure.size, Enclosure.location, Enclosure.description)
+        .order_by(Enclosure.id),
+        "Общее количество вольеров: {count}"),
+    "Отчёт по кормам": TableReport(
+        [ReportColumn("Название", 60), ReportColumn("Описание", 130, format=or_default("Нет описания"))],
+        lambda: select(Feed.name, Feed.description).order_by(Feed.id),
+        "Общее количество кормов: {count}"),
+    "Отчёт по кормлению": TableReport(
+        [ReportColumn("Животное", 75, format=or_default("Не указано")),
+         ReportColumn("Корм", 75, format=or_default("Не указано")),
+         ReportColumn("Суточная норма", 40, "R", lambda amount: f"{amount} кг")],
+        lambda: select(Animal.name, Feed.name, AnimalFeed.daily_amount)
+        .outerjoin(Animal, AnimalFeed.animal_id == Animal.id)
+        .outerjoin(Feed, AnimalFeed.feed_id == Feed.id)
+        .order_by(AnimalFeed.id),
+        "Общее количество корма в сутки: {total:.2f} кг", total_column=2,
+        summaries=[
+            ReportSummary(
+                "Суточный расход по кормам",
+                [ReportColumn("Корм", 100, format=or_default("Не указан")), ReportColumn("Животных", 40, "R"),
+                 ReportColumn("Суточная норма", 50, "R", lambda amount: f"{amount or 0:.2f} кг")],
+                lambda: select(Feed.name, func.count(AnimalFeed.animal_id.distinct()), func.sum(AnimalFeed.daily_amount))
+                .select_from(AnimalFeed)
+                .outerjoin(Feed, AnimalFeed.feed_id == Feed.id)
+                .group_by(Feed.id, Feed.name)
+                .order_by(func.sum(AnimalFeed.daily_amount).desc(), Feed.name)),
+        ]),
+    "Отчёт по медицинским записям": TableReport(
+        [ReportColumn("Животное", 50, format=or_default("Не указано")), ReportColumn("Дата осмотра", 30, "C"),
+         ReportColumn("Заметки", 110, format=or_default("Нет заметок"))],
+        lambda: select(Animal.name, HealthRecord.checkup_date, HealthRecord.notes)
+        .outerjoin(Animal, HealthRecord.animal_id == Animal.id)
+        .order_by(HealthRecord.id),
+        "Общее количество медицинских записей: {count}",
+        summaries=[
+            ReportSummary(
+                "Осмотры по месяцам",
+                [ReportColumn("Год", 60, "C"), ReportColumn("Месяц", 60, "C"), ReportColumn("Осмотров", 70, "R")],
+                lambda: select(cast(extract("year", HealthRecord.checkup_date), Integer).label("year"),
+                               cast(extract("month", HealthRecord.checkup_date), Integer).label("month"),
+                               func.count(HealthRecord.id))
+                .group_by("year", "month")
+                .order_by("year", "month")),
+        ]),
+    "Отчёт по ухаживающим": TableReport(
+        [ReportColumn("Сотрудник", 95, format=or_default("Не указано")),
+         ReportColumn("Животное", 95, format=or_default("Не указано"))],
+        lambda: select(Employee.name, Animal.name)
+        .select_from(AnimalCaretaker)
+        .outerjoin(Employee, AnimalCaretaker.employee_id == Employee.id)
+        .outerjoin(Animal, AnimalCaretaker.animal_id == Animal.id)
+        .order_by(AnimalCaretaker.id),
+        "Общее количество назначений: {count}",
+        summaries=[
+            ReportSummary(
+                "Нагрузка на сотрудников",
+                [ReportColumn("Сотрудник", 140, format=or_default("Не указано")),
+                 ReportColumn("Животных", 50, "R")],
+                lambda: select(Employee.name, func.count(AnimalCaretaker.animal_id))
+                .select_from(AnimalCaretaker)
+                .outerjoin(Employee, AnimalCaretaker.employee_id == Employee.id)
+                .group_by(Employee.id, Employee.name)
+                .order_by(func.count(AnimalCaretaker.animal_id).desc(), Employee.name)),
+        ]),
+}
+
+
+# Построение отчёта. Не обращается к виджетам, поэтому выполняется в фоновом потоке.
+# progress(готово, всего) вызывается по ходу чтения строк и может прервать
+# построение, выбросив ReportCancelled
+def build_report(report_type, animal_name=None, progress=None):
+    # fpdf загружается только при первом отчёте, а не при запуске приложения
+    from report_pdf import ReportPDF
+    from fonts import register_font
+    with get_session() as session:
+        pdf = ReportPDF()
+        pdf.set_auto_page_break(auto=True, margin=15)
+        register_font(pdf)
+        pdf.add_page()
+
+        pdf.set_font('FreeSans', '', 16)
+        pdf.cell(0, 10, f"{report_type}", ln=True, align='C')
+        pdf.ln(5)
+
+        if report_type == "Отчёт по родословной":
+            animal, pedigree = pedigree_report(session, animal_name)
+            pdf.set_font('FreeSans', '', 12)
+            pdf.multi_cell(0, 10, f"Родословная для {animal.name}:\n{pedigree}")
+        else:
+            REPORTS[report_type].write(pdf, session, progress)
+
+        return pdf
+
+
+def write_report(report_type, path, animal_name=None, progress=None):
+    pdf = build_report(report_type, animal_name, progress)
+    if progress is not None:
+        progress(1, 1)
+    pdf.output(path)
+    return path
+
+
+def pedigree_report(session, animal_name):
+    animal = session.query(Animal).filter(Animal.name.ilike(f"%{animal_name}%")).first()
+    if not animal:
+        raise ReportError(f"Животное с именем '{animal_name}' не найдено.")
+    return animal, build_pedigree(animal, session)
+
+
+def build_pedigree(animal, session, max_depth=5):
+    return Pedigree.load(session, animal.id).render(animal.id, max_depth=max_depth)
@@ -0,0 +1,66 @@
+from db import get_session, unit_of_work
+from queries import SECTIONS, PAGE_SIZE
+from reports import REPORTS, pedigree_report
+
+
+# Операции с записями раздела без Qt: главное окно, импорт, скрипты и замеры
+# работают с базой через эти методы
+class Repository:
+    def __init__(self, section):
+        self.section = section
+        self.model = section.model
+
+    def list(self, after_id=0, limit=PAGE_SIZE):
+        return self.section.fetch_page(after_id, limit)
+
+    def search(self, text, after_id=0, limit=PAGE_SIZE):
+        return self.section.fetch_page(after_id, limit, text.lower())
+
+    def get(self, item_id):
+        # Запись возвращается отсоединённой от сессии, столбцы уже загружены
+        with get_session() as session:
+            return session.get(self.model, item_id)
+
+    def create(self, **values):
+        with unit_of_work() as session:
+            item = self.model(**values)
+            session.add(item)
+            session.flush()
+            return item.id
+
+    def update(self, item_id, **values):
+        with unit_of_work() as session:
+            item = session.get(self.model, item_id)
+            if item is None:
+                return False
+            for name, value in values.items():
+                setattr(item, name, value)
+            return True
+
+    def delete(self, item_id):
+        with unit_of_work() as session:
+            item = session.get(self.model, item_id)
+            if item is None:
+                return False
+            session.delete(item)
+            return True
+
+
+REPOSITORIES = {name: Repository(section) for name, section in SECTIONS.items()}
+
+
+# Данные отчёта без построения PDF: строки, итоги и сводные таблицы
+# (для родословной - найденное животное и текст родословной)
+def report_data(report_type, animal_name=None):
+    with get_session() as session:
+        if report_type == "Отчёт по родословной":
+            animal, pedigree = pedigree_report(session, animal_name)
+            return {"animal": animal.name, "pedigree": pedigree}
+        report = REPORTS[report_type]
+        count, total = report.totals(session)
+        return {
+            "rows": session.execute(report.query()).all(),
+            "count": count,
+            "total": total,
+            "summaries": {summary.title: session.execute(summary.query()).all() for summary in report.summaries},
+        }
@@ -0,0 +1,20 @@
+import sys
+import time
+
+# Отсчёт от импорта этого модуля: zap.py импортирует его первым, до PySide6 и SQLAlchemy
+STARTED = time.perf_counter()
+phases = []
+
+
+def mark(name):
+    phases.append((name, time.perf_counter()))
+
+
+# Длительность этапов запуска (каждый - от конца предыдущего) в stderr
+def report():
+    parts = []
+    previous = STARTED
+    for name, moment in phases:
+        parts.append(f"{name} {(moment - previous) * 1000:.0f} мс")
+        previous = moment
+    print(f"Запуск: {', '.join(parts)}; всего {(previous - STARTED) * 1000:.0f} мс", file=sys.stderr)
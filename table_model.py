@@ -0,0 +1,224 @@
+from bisect import bisect_left
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt, Signal
+from queries import PAGE_SIZE
+import profiler
+
+
+def collect_changes(section, text, changes, loaded_ids, max_id, watermark):
+    # Выполняется в потоке DbExecutor: определяет, какие строки перечитать,
+    # и возвращает (строки, проверенные id, водяной знак) или None, если изменений нет
+    if changes is None:
+        new_watermark = section.watermark()
+        if new_watermark is not None and new_watermark == watermark:
+            return None
+        return section.fetch_rows(text, max_id=max_id), loaded_ids, new_watermark
+    if any(table in section.related_tables() for table, _, _ in changes):
+        return section.fetch_rows(text, max_id=max_id), loaded_ids, watermark
+    changed_ids = {row_id for table, _, row_id in changes if table == section.table_name()}
+    if not changed_ids:
+        return None
+    return section.fetch_rows(text, ids=changed_ids), changed_ids, watermark
+
+
+def fetch_first_page(section, text):
+    # Водяной знак читается вместе с первой страницей и до неё: изменение между
+    # ними заметит следующая проверка, а не пропустит
+    watermark = section.watermark()
+    return section.fetch_page(0, PAGE_SIZE, text), watermark
+
+
+# Модель таблицы раздела. Значения хранятся по столбцам (один список на столбец),
+# а строка для ячейки формируется только когда представление запрашивает data().
+# Строки подгружаются страницами по мере прокрутки (canFetchMore/fetchMore),
+# запросы выполняются в DbExecutor, а модель меняется только в GUI-потоке
+class SectionTableModel(QAbstractTableModel):
+    load_failed = Signal(object)
+    page_ready = Signal()
+
+    def __init__(self, headers, executor, parent=None):
+        super().__init__(parent)
+        self.headers = headers
+        self.executor = executor
+        self.ids = []
+        self.columns = [[] for _ in headers]
+        self.section = None
+        self.text = None
+        self.watermark = None
+        self.exhausted = True
+        self.loading = False
+        # Изменения, полученные от ChangeListener, но ещё не применённые к модели;
+        # recheck_pending - нужна проверка по водяному знаку (уведомления недоступны)
+        self.pending_changes = set()
+        self.recheck_pending = False
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.ids)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return str(self.columns[index.column()][index.row()])
+        if role == Qt.UserRole:
+            return self.ids[index.row()]
+        return None
+
+    def row_id(self, row):
+        # Первичный ключ строки в том виде, в каком она показана (с учётом поиска)
+        if 0 <= row < len(self.ids):
+            return self.ids[row]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section]
+        return str(section + 1)
+
+    def set_source(self, section, text=None):
+        self.executor.cancel((id(self), "page"))
+        self.executor.cancel((id(self), "refresh"))
+        self.beginResetModel()
+        self.ids = []
+        self.columns = [[] for _ in self.headers]
+        self.section = section
+        self.text = text
+        self.watermark = None
+        self.exhausted = False
+        self.loading = False
+        # Строки читаются заново, накопленные изменения в них уже учтены
+        self.pending_changes = set()
+        self.recheck_pending = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def can_refine(self, text):
+        # Если новый запрос продолжает предыдущий и его результат загружен целиком,
+        # новые строки из базы появиться не могут - достаточно отфильтровать загруженные
+        return (self.section is not None and self.section.search_columns and self.text
+                and self.exhausted and not self.loading and text.startswith(self.text))
+
+    def refine(self, text):
+        self.executor.cancel((id(self), "refresh"))
+        self.beginResetModel()
+        keep = [position for position in range(len(self.ids))
+                if self.section.matches([column[position] for column in self.columns], text)]
+        self.ids = [self.ids[position] for position in keep]
+        self.columns = [[column[position] for position in keep] for column in self.columns]
+        self.text = text
+        self.endResetModel()
+        self.submit_refresh()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted and not self.loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted or self.loading:
+            return
+        self.loading = True
+        # При прокрутке это отдельное действие, при смене раздела или поиске - часть их действия
+        with profiler.action(f"Подгрузка строк: {self.section.name}"):
+            if self.ids:
+                self.executor.submit((id(self), "page"), self.section.fetch_page, self.ids[-1], PAGE_SIZE, self.text,
+                                     on_result=self.page_loaded, on_error=self.page_failed)
+            else:
+                self.executor.submit((id(self), "page"), fetch_first_page, self.section, self.text,
+                                     on_result=self.first_page_loaded, on_error=self.page_failed)
+
+    def first_page_loaded(self, result):
+        rows, self.watermark = result
+        self.page_loaded(rows)
+
+    def page_loaded(self, rows):
+        self.loading = False
+        if len(rows) < PAGE_SIZE:
+            self.exhausted = True
+        self.append_rows(rows)
+        self.page_ready.emit()
+        self.submit_refresh()
+
+    def page_failed(self, error):
+        self.loading = False
+        self.exhausted = True
+        self.load_failed.emit(error)
+
+    def append_rows(self, rows):
+        if not rows:
+            return
+        first = len(self.ids)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        for row_id, values in rows:
+            self.ids.append(row_id)
+            for column, value in zip(self.columns, values):
+                column.append(value)
+        self.endInsertRows()
+
+    def refresh(self, changes):
+        # changes - список (таблица, операция, id) от ChangeListener или None,
+        # если уведомления недоступны и изменения определяются по Section.watermark.
+        # Уведомления из сокета уже прочитаны, поэтому они копятся в pending_changes,
+        # пока обновление с ними не применено: пропущенное (идёт загрузка страницы)
+        # или отменённое более новым обновление отправляется заново вместе с новыми
+        if self.section is None:
+            return
+        if changes is None:
+            self.recheck_pending = True
+        else:
+            self.pending_changes.update(changes)
+        self.submit_refresh()
+
+    def submit_refresh(self):
+        if self.loading or not (self.pending_changes or self.recheck_pending):
+            return
+        # Известные изменения применяются точечно, проверка по водяному знаку - когда их нет
+        submitted = set(self.pending_changes)
+        recheck = not submitted
+        changes = list(submitted) if submitted else None
+        max_id = None if self.exhausted else (self.ids[-1] if self.ids else 0)
+        self.executor.submit((id(self), "refresh"), collect_changes, self.section, self.text, changes,
+                             set(self.ids), max_id, self.watermark,
+                             on_result=lambda result: self.changes_loaded(result, submitted, recheck))
+
+    def changes_loaded(self, result, submitted, recheck):
+        self.pending_changes -= submitted
+        if recheck:
+            self.recheck_pending = False
+        if result is None:
+            return
+        rows, checked_ids, self.watermark = result
+        self.apply_changes(rows, checked_ids)
+
+    def apply_changes(self, rows, checked_ids):
+        # Строки из checked_ids, которых нет в rows, удалены или больше не подходят под поиск
+        fresh_ids = {row_id for row_id, _ in rows}
+        for row_id in sorted(checked_ids - fresh_ids, reverse=True):
+            position = bisect_left(self.ids, row_id)
+            if position < len(self.ids) and self.ids[position] == row_id:
+                self.beginRemoveRows(QModelIndex(), position, position)
+                del self.ids[position]
+                for column in self.columns:
+                    del column[position]
+                self.endRemoveRows()
+        for row_id, values in rows:
+            position = bisect_left(self.ids, row_id)
+            if position < len(self.ids) and self.ids[position] == row_id:
+                if [column[position] for column in self.columns] != list(values):
+                    for column, value in zip(self.columns, values):
+                        column[position] = value
+                    self.dataChanged.emit(self.index(position, 0),
+                                          self.index(position, len(self.columns) - 1))
+            elif self.exhausted or position < len(self.ids):
+                # Строки за последним загруженным id придут со следующей страницей
+                self.beginInsertRows(QModelIndex(), position, position)
+                self.ids.insert(position, row_id)
+                for column, value in zip(self.columns, values):
+                    column.insert(position, value)
+                self.endInsertRows()
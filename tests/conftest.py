@@ -0,0 +1,66 @@
+import os
+import sys
+from datetime import date
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db
+
+
+# Связанные записи для каждого раздела: у животных есть вид и вольер, у потомства -
+# оба родителя, у медицинских записей, кормления и ухаживающих - животное
+def seed(session, animals=20):
+    species = [db.Species(name=name) for name in ("Lion", "Tiger", "Wolf")]
+    enclosures = [db.Enclosure(name=name, size=100.0, location="North zone", description="Open air")
+                  for name in ("North", "South")]
+    position = db.Position(name="Vet")
+    feed = db.Feed(name="Meat", description="Beef")
+    session.add_all(species + enclosures + [position, feed])
+    session.flush()
+    employee = db.Employee(name="Ivanov", position_id=position.id, phone="100", hire_date=date(2020, 1, 1))
+    session.add(employee)
+    items = [db.Animal(name=f"Barsik {number}", species_id=species[number % 3].id,
+                       enclosure_id=enclosures[number % 2].id, sex="Female" if number % 2 else "Male",
+                       date_of_birth=date(2018, 1, 1), date_of_arrival=date(2019, 1, 1))
+             for number in range(animals)]
+    session.add_all(items)
+    session.flush()
+    for number, animal in enumerate(items):
+        session.add(db.HealthRecord(animal_id=animal.id, checkup_date=date(2022, 1, 1), notes="Healthy"))
+        session.add(db.AnimalFeed(animal_id=animal.id, feed_id=feed.id, daily_amount=2.5))
+        session.add(db.AnimalCaretaker(animal_id=animal.id, employee_id=employee.id))
+        if number >= 2:
+            session.add(db.Offspring(name=f"Cub {number}", mother_id=items[number - 1].id,
+                                     father_id=items[number - 2].id, date_of_birth=date(2021, 1, 1), sex="Male"))
+
+
+# Схема в SQLite в памяти; сессии приложения (get_session, unit_of_work) на время теста
+# переключаются на неё
+@pytest.fixture
+def database():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    db.migrate(engine)
+    db.ScopedSession.remove()
+    db.Session.configure(bind=engine)
+    with db.unit_of_work() as session:
+        seed(session)
+    yield engine
+    db.ScopedSession.remove()
+    db.Session.configure(bind=db.engine)
+    engine.dispose()
+
+
+# Список SQL-запросов, выполненных в тесте после заполнения базы
+@pytest.fixture
+def statements(database):
+    executed = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(database, "before_cursor_execute", count)
+    yield executed
+    event.remove(database, "before_cursor_execute", count)
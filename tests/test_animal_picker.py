@@ -0,0 +1,68 @@
+import os
+import time
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtWidgets = pytest.importorskip("PySide6.QtWidgets")
+
+import db
+from animal_picker import AnimalPicker, picker_executor
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def namesakes(database):
+    with db.unit_of_work() as session:
+        species_id = session.query(db.Species.id).first()[0]
+        enclosure_id = session.query(db.Enclosure.id).first()[0]
+        for _ in range(2):
+            session.add(db.Animal(name="Murka", species_id=species_id, enclosure_id=enclosure_id, sex="Female"))
+
+
+def search(app, picker):
+    # Страница подсказки читается в потоке пула и приходит сигналом
+    picker.search()
+    while picker.loading:
+        picker_executor().wait()
+        time.sleep(0.01)
+        app.processEvents()
+
+
+def picker_with_text(app, text):
+    picker = AnimalPicker()
+    picker.setText(text)
+    search(app, picker)
+    return picker
+
+
+def test_unique_name_is_resolved(app, database):
+    with db.get_session() as session:
+        animal_id = session.query(db.Animal.id).filter_by(name="Barsik 3").scalar()
+    picker = picker_with_text(app, "barsik 3")
+    assert picker.currentData() == animal_id
+    assert picker.error() is None
+
+
+@pytest.mark.parametrize("searched", [True, False])
+def test_duplicate_name_is_not_resolved(app, namesakes, searched):
+    picker = AnimalPicker()
+    picker.setText("Murka")
+    if searched:
+        search(app, picker)
+        assert picker.items.rowCount() == 2
+    assert picker.currentData() is None
+    assert picker.error().startswith("Несколько животных")
+
+
+# Страница устаревшего набора не попадает в подсказку
+def test_newer_search_drops_stale_page(app, namesakes):
+    picker = AnimalPicker()
+    picker.setText("barsik")
+    picker.search()
+    picker.setText("murka")
+    search(app, picker)
+    assert [picker.items.item(row).text() for row in range(picker.items.rowCount())] == ["Murka", "Murka"]
@@ -0,0 +1,25 @@
+import pytest
+import db
+from bulk_import import BulkImportError, import_file
+
+
+def write_csv(tmp_path, text):
+    path = tmp_path / "import.csv"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_references_match_names_case_insensitively(database, tmp_path):
+    path = write_csv(tmp_path, "animal;checkup_date;notes\nbarsik 1;2023-05-01;ok\nBARSIK 2;01.06.2023;ok\n")
+    assert import_file("Медицина", path).count == 2
+    with db.get_session() as session:
+        names = sorted(record.fk_animal.name for record in
+                       session.query(db.HealthRecord).filter(db.HealthRecord.notes == "ok"))
+    assert names == ["Barsik 1", "Barsik 2"]
+
+
+def test_unknown_reference_rejects_whole_file(database, tmp_path):
+    path = write_csv(tmp_path, "animal;checkup_date\nbarsik 1;2023-05-01\nMurka;2023-05-01\n")
+    with pytest.raises(BulkImportError) as error:
+        import_file("Медицина", path)
+    assert error.value.errors == ["Запись 2: не найдено: «Murka»"]
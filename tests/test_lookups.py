@@ -0,0 +1,30 @@
+import lookups
+from db import Species
+
+
+def test_fallback_keeps_fresh_lookups(statements):
+    lookups.invalidate_tables(lookups.LOOKUPS)
+    lookups.lookup(Species)
+    statements.clear()
+    lookups.invalidate_changes(None)
+    assert [name for _, name in lookups.lookup(Species)] == ["Lion", "Tiger", "Wolf"]
+    assert statements == []
+
+
+def test_fallback_reloads_stale_lookups(statements, monkeypatch):
+    lookups.invalidate_tables(lookups.LOOKUPS)
+    lookups.lookup(Species)
+    monkeypatch.setattr(lookups, "FALLBACK_MAX_AGE", -1)
+    statements.clear()
+    lookups.invalidate_changes(None)
+    lookups.lookup(Species)
+    assert len(statements) == 1
+
+
+def test_notifications_invalidate_only_changed_tables(statements):
+    lookups.invalidate_tables(lookups.LOOKUPS)
+    lookups.lookup(Species)
+    statements.clear()
+    lookups.invalidate_changes([("feed", "UPDATE", 1)])
+    lookups.lookup(Species)
+    assert statements == []
@@ -0,0 +1,15 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+import db
+
+
+def test_migrate_is_repeatable_with_expression_index():
+    # Отражение SQLite не видит индекс по lower(name), поэтому повторный migrate()
+    # должен пропускать существующие индексы сам (IF NOT EXISTS)
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    db.migrate(engine)
+    db.migrate(engine)
+    with engine.connect() as connection:
+        indexes = set(connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars())
+    assert "ix_animal_name_prefix" in indexes
+    engine.dispose()
@@ -0,0 +1,37 @@
+from datetime import date
+import pytest
+import db
+from queries import SECTIONS
+
+
+@pytest.fixture
+def special_rows(database):
+    with db.unit_of_work() as session:
+        session.add(db.Offspring(name="Orphan", date_of_birth=date(2021, 1, 1), sex="Female"))
+        session.add(db.Feed(name="Mix 100%", description="grain_free"))
+        session.add(db.Feed(name="Mix 1000", description="grainXfree"))
+
+
+def refined(section, loaded_text, text):
+    # Результат уточнения в памяти, как в SectionTableModel.refine
+    return [row_id for row_id, values in section.fetch_page(0, text=loaded_text)
+            if section.matches(values, text)]
+
+
+@pytest.mark.parametrize("name, loaded_text, text", [
+    ("Потомство", None, "неизв"),
+    ("Потомство", "o", "orph"),
+    ("Корма", "mix", "mix 100%"),
+    ("Корма", "grain", "grain_"),
+])
+def test_refine_matches_database(special_rows, name, loaded_text, text):
+    section = SECTIONS[name]
+    expected = [row_id for row_id, _ in section.fetch_page(0, text=text)]
+    assert refined(section, loaded_text, text) == expected
+
+
+def test_wildcards_are_literal(special_rows):
+    names = [values[0] for _, values in SECTIONS["Корма"].fetch_page(0, text="100%")]
+    assert names == ["Mix 100%"]
+    descriptions = [values[1] for _, values in SECTIONS["Корма"].fetch_page(0, text="_")]
+    assert descriptions == ["grain_free"]
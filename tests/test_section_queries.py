@@ -0,0 +1,41 @@
+import pytest
+from queries import SECTIONS
+
+# Текст поиска, который находит строки раздела через связанную таблицу
+SEARCH_TEXT = {
+    "Животные": "lion",
+    "Сотрудники": "vet",
+    "Вольеры": "north",
+    "Корма": "meat",
+    "Кормление": "meat",
+    "Медицина": "barsik",
+    "Потомство": "barsik",
+}
+
+
+@pytest.mark.parametrize("name", list(SECTIONS))
+def test_page_is_one_statement(statements, name):
+    rows = SECTIONS[name].fetch_page(0)
+    assert rows
+    assert len(statements) == 1, statements
+
+
+@pytest.mark.parametrize("name", list(SECTIONS))
+def test_next_page_is_one_statement(statements, name):
+    first = SECTIONS[name].fetch_page(0, limit=5)
+    statements.clear()
+    SECTIONS[name].fetch_page(first[-1][0], limit=5)
+    assert len(statements) == 1, statements
+
+
+@pytest.mark.parametrize("name", list(SEARCH_TEXT))
+def test_search_is_one_statement(statements, name):
+    rows = SECTIONS[name].fetch_page(0, text=SEARCH_TEXT[name])
+    assert rows
+    assert len(statements) == 1, statements
+
+
+def test_related_names_are_loaded_with_the_page(statements):
+    rows = dict(SECTIONS["Потомство"].fetch_page(0))
+    assert rows[1][:3] == ["Cub 2", "Barsik 1", "Barsik 0"]
+    assert len(statements) == 1
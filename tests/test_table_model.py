@@ -0,0 +1,20 @@
+import pytest
+
+pytest.importorskip("PySide6.QtCore")
+
+import db
+from queries import SECTIONS
+from table_model import collect_changes, fetch_first_page
+
+
+# Без уведомлений переименование в связанной таблице должно попасть в таблицу раздела
+def test_fallback_rereads_related_rename(database):
+    section = SECTIONS["Животные"]
+    rows, watermark = fetch_first_page(section, None)
+    with db.unit_of_work() as session:
+        session.query(db.Species).filter_by(name="Lion").update({"name": "Puma"})
+    result = collect_changes(section, None, None, {row_id for row_id, _ in rows}, None, watermark)
+    assert result is not None
+    fresh, checked_ids, _ = result
+    assert checked_ids == {row_id for row_id, _ in rows}
+    assert "Puma" in {values[1] for _, values in fresh}
@@ -0,0 +1,172 @@
+from PySide6.QtWidgets import QApplication
+
+# Единая таблица стилей приложения. Разбирается один раз при установке на
+# QApplication; состояние виджетов (выбранный раздел) задаётся динамическими
+# свойствами и селекторами вида [active="true"], а не заменой стилей виджета
+THEME = """
+    QMainWindow { background-color: #F5F6FF; font-family: 'Regular', 'Inter'; }
+    QLabel#logo { padding: 10px; }
+    QLineEdit {
+        background-color: #FFFFFF;
+        border: 1px solid #ECECEC;
+        border-radius: 5px;
+        padding: 10px 15px;
+        font-size: 14px;
+    }
+    #save, #cancel { text-align: center; }
+    QPushButton {
+        background-color: #FFFFFF;
+        color: #636363;
+        border-radius: 5px;
+        border: 1px solid #ECECEC;
+        padding: 5px 10px;
+        font-size: 14px;
+        text-align: left;
+    }
+    QPushButton#report_button {
+        background-color: #FFFFFF;
+        color: #636363;
+        border-radius: 5px;
+        border: 1px solid #ECECEC;
+        padding: 5px 10px;
+        font-size: 14px;
+        text-align: center;
+    }
+    QPushButton#report_button:hover {
+        background-color: #C7E8FF;
+        color: #636363;
+        border: 1px solid #ECECEC;
+    }
+    QPushButton#delete_button {
+        background-color: #FFC1C1;
+        color: #636363;
+        border-radius: 5px;
+        border: 1px solid #ECECEC;
+        text-align: center;
+    }
+    QPushButton#delete_button:hover {
+        background-color: #FF9999;
+        color: #FFFFFF;
+        border: 1px solid #ECECEC;
+    }
+    QPushButton#add_button {
+        background-color: #5FFFD2;
+        color: #636363;
+        border-radius: 5px;
+        border: 1px solid #ECECEC;
+        text-align: center;
+    }
+    QPushButton#add_button:hover {
+        background-color: #00E6A8;
+        color: #FFFFFF;
+        border: 1px solid #ECECEC;
+    }
+    QPushButton#export_button, QPushButton#import_button {
+        background-color: #C7E8FF;
+        color: #636363;
+        border-radius: 5px;
+        border: 1px solid #ECECEC;
+        text-align: center;
+    }
+    QPushButton#export_button:hover, QPushButton#import_button:hover {
+        background-color: #8FCFFF;
+        color: #FFFFFF;
+        border: 1px solid #ECECEC;
+    }
+    QPushButton#add_species_button, QPushButton#add_position_button, QPushButton#add_feed_button {
+        background-color: #FFFFFF;
+        color: #636363;
+        border: 1px solid #ECECEC;
+        border-radius: 5px;
+        padding: 5px 10px;
+        font-size: 14px;
+    }
+    QPushButton#add_species_button:hover, QPushButton#add_position_button:hover, QPushButton#add_feed_button:hover {
+        background-color: #C7E8FF;
+        color: #636363;
+    }
+    QPushButton:hover {
+        background-color: #C7E8FF;
+        color: #636363;
+    }
+    QTableView {
+        background-color: #FFFFFF;
+        border: 1px solid #ECECEC;
+        border-radius: 5px;
+        font-size: 12px;
+        alternate-background-color: #FFFFFF;
+    }
+    QTableView::item {
+        padding: 5px;
+    }
+    QHeaderView::section {
+        background-color: #C7E8FF;
+        color: #636363;
+        padding: 5px;
+        font-size: 12px;
+    }
+    QHeaderView {
+        background-color: rgba(0,0,0,0);
+    }
+    QDialog {
+        background-color: #F5F6FF;
+        border: 1px solid #ECECEC;
+        border-radius: 10px;
+    }
+    QComboBox {
+        background-color: #FFFFFF;
+        border: 1px solid #ECECEC;
+        border-radius: 5px;
+        padding: 5px 10px;
+        font-size: 14px;
+        color: #636363;
+    }
+    QComboBox:hover {
+        background-color: #C7E8FF;
+    }
+    QComboBox QAbstractItemView {
+        color: #636363;
+        background-color: #FFFFFF;
+        selection-background-color: #C7E8FF;
+    }
+    QPushButton#section_button {
+        background-color: #FFFFFF;
+        color: #636363;
+        border-radius: 5px;
+        border: 1px solid #ECECEC;
+        padding: 5px 10px;
+        padding-right: 50px;
+        font-size: 14px;
+        text-align: left;
+    }
+    QPushButton#section_button:hover, QPushButton#section_button[active="true"] {
+        background-color: #C7E8FF;
+        color: #636363;
+    }
+    QPushButton#section_plus_button {
+        background-color: transparent;
+        border: none;
+        qproperty-iconSize: 24px;
+        padding: 3px;
+    }
+    QPushButton#section_plus_button:hover {
+        background-color: #C7E8FF;
+        border-radius: 10px;
+    }
+"""
+
+
+def apply_theme(app=None):
+    app = app or QApplication.instance()
+    if app.styleSheet() != THEME:
+        app.setStyleSheet(THEME)
+
+
+# Смена динамического свойства: Qt пересчитывает стиль виджета по уже разобранной
+# таблице стилей. Если значение не изменилось, виджет не трогается
+def set_style_state(widget, name, value):
+    if widget.property(name) == value:
+        return
+    widget.setProperty(name, value)
+    widget.style().unpolish(widget)
+    widget.style().polish(widget)
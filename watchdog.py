@@ -0,0 +1,105 @@
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from PySide6.QtCore import QObject, QTimer, Qt
+from db import load_config
+
+HEARTBEAT_MS = 50
+# Верхние границы интервалов гистограммы задержки цикла событий, мс
+BUCKETS_MS = [16, 50, 100, 250, 500, 1000, 5000]
+MAX_STALLS = 100
+
+
+def bucket_label(latency_ms):
+    lower = 0
+    for upper in BUCKETS_MS:
+        if latency_ms < upper:
+            return f"{lower}-{upper}"
+        lower = upper
+    return f"{lower}+"
+
+
+# Сторож GUI-потока. Таймер в цикле событий отмечает каждый свой запуск, и по
+# опозданию отметки строится гистограмма задержки. Отдельный поток проверяет
+# отметки и, если GUI-поток занят дольше порога, снимает его стек, пока тот
+# ещё выполняет блокирующий код. Отчёт переписывается после каждого зависания
+class StallWatchdog(QObject):
+    def __init__(self, path, threshold_ms, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.threshold = threshold_ms / 1000
+        self.histogram = Counter()
+        self.stalls = []
+        self.current = None
+        self.lock = threading.Lock()
+        self.gui_thread_id = threading.get_ident()
+        self.last_beat = time.perf_counter()
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.beat)
+        self.timer.start(HEARTBEAT_MS)
+
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.watch, name="stall-watchdog", daemon=True)
+        self.thread.start()
+
+    def beat(self):
+        now = time.perf_counter()
+        with self.lock:
+            latency = max(0.0, now - self.last_beat - HEARTBEAT_MS / 1000)
+            self.last_beat = now
+            self.histogram[bucket_label(latency * 1000)] += 1
+            stall, self.current = self.current, None
+        if stall is not None:
+            stall["duration_ms"] = round(latency * 1000)
+            self.write()
+
+    def watch(self):
+        while not self.stopped.wait(self.threshold / 4):
+            with self.lock:
+                blocked = time.perf_counter() - self.last_beat - HEARTBEAT_MS / 1000
+                if blocked < self.threshold or self.current is not None:
+                    continue
+                frame = sys._current_frames().get(self.gui_thread_id)
+                self.current = {
+                    "started": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "duration_ms": None,
+                    "stack": "".join(traceback.format_stack(frame)) if frame is not None else "",
+                }
+                self.stalls.append(self.current)
+                del self.stalls[:-MAX_STALLS]
+
+    def write(self):
+        with self.lock:
+            histogram = dict(self.histogram)
+            stalls = list(self.stalls)
+        total = sum(histogram.values())
+        lines = [f"Задержка цикла событий GUI, мс (отметок: {total})"]
+        for latency_ms in [0] + BUCKETS_MS:
+            label = bucket_label(latency_ms)
+            lines.append(f"  {label:>10}: {histogram.get(label, 0)}")
+        lines.append("")
+        lines.append(f"Зависания дольше {round(self.threshold * 1000)} мс: {len(stalls)}")
+        for stall in stalls:
+            duration = "продолжается" if stall["duration_ms"] is None else f"{stall['duration_ms']} мс"
+            lines.append("")
+            lines.append(f"--- {stall['started']}, {duration}")
+            lines.append(stall["stack"].rstrip())
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+
+    def stop(self):
+        self.timer.stop()
+        self.stopped.set()
+        self.thread.join()
+        self.write()
+
+
+def start_watchdog(parent=None):
+    config = load_config()
+    if not config["stall_log"]:
+        return None
+    return StallWatchdog(config["stall_log"], int(config["stall_threshold"]), parent)
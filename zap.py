@@ -1,7 +1,19 @@
+import startup
 from PySide6.QtWidgets import QApplication
 from main import MainWindow
+from watchdog import start_watchdog
 
-app = QApplication([])
-window = MainWindow()
-window.show()
-app.exec()
\ No newline at end of file
+startup.mark("импорт")
+
+# Без этой проверки процессы, запускаемые для пакетной выгрузки отчётов,
+# заново выполняли бы скрипт и открывали собственное окно
+if __name__ == "__main__":
+    app = QApplication([])
+    # Сторож запускается до окна, чтобы в отчёт попали и зависания при запуске
+    watchdog = start_watchdog(app)
+    window = MainWindow()
+    startup.mark("создание окна")
+    window.show()
+    app.exec()
+    if watchdog is not None:
+        watchdog.stop()